@@ -0,0 +1,354 @@
+"""Micro-benchmarks for the headless invoice code.
+
+Run all of them with ``python benchmarks.py`` or pick some by name,
+e.g. ``python benchmarks.py money``.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from invoice_engine import round_div, Money, MODES, InvoiceModel
+
+calculate_patti = MODES["Patti"].calculate
+PattiLine = MODES["Patti"].line_type
+
+PAISA = Decimal("0.01")
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _patti_rows(count, seed=1):
+    """Random Patti rows; rates and hamali come from a day's short list, as in the real book."""
+    rng = random.Random(seed)
+    rates = [f"{rng.randint(1000, 900000) / 100:.2f}" for _ in range(150)]
+    hamali_rates = ["5", "6", "7.50", "8", "10", "12.50"]
+    return [
+        [
+            "MAIZE",
+            str(rng.randint(1, 200)),
+            f"{rng.randint(50, 20000) / 10:.1f}",
+            str(rng.randint(0, 5)),
+            rng.choice(rates),
+            rng.choice(hamali_rates),
+        ]
+        for _ in range(count)
+    ]
+
+
+def _decimal_patti(cells):
+    """calculate_patti with the same formulas and record, in decimal.Decimal."""
+    item = cells[0].strip()
+    texts = tuple(c.strip() for c in cells[1:6])
+    pkt, qty, plus_value, rate, hamali_rate = (Decimal(t or 0) for t in texts)
+    hamali = (pkt * hamali_rate).quantize(PAISA, rounding=ROUND_HALF_UP)
+    amount = ((qty + plus_value) * rate).quantize(PAISA, rounding=ROUND_HALF_UP) - hamali
+    return PattiLine(item, texts, pkt, qty, plus_value, rate, hamali_rate, qty + plus_value, pkt, hamali, amount)
+
+
+def _decimal_patti_total(rows):
+    return sum(_decimal_patti(row).amount for row in rows)
+
+
+def _fixed_patti_total(rows):
+    return Money(sum(calculate_patti(row).amount for row in rows))
+
+
+def _decimal_retotal(lines):
+    return sum(
+        ((line.quantity + line.plus) * line.rate).quantize(PAISA, rounding=ROUND_HALF_UP) - line.hamali
+        for line in lines
+    )
+
+
+def _fixed_retotal(lines):
+    return Money(sum(round_div((line.quantity + line.plus) * line.rate, 1000) - line.hamali for line in lines))
+
+
+def bench_money(count=100_000):
+    """Integer-paise Patti lines against the same formulas in decimal.Decimal.
+
+    Parsing the typed texts costs about the same either way; the integer
+    arithmetic is what is faster (see re-total).
+    """
+    rows = _patti_rows(count)
+    fixed_total, fixed_time = _timed(_fixed_patti_total, rows)
+    decimal_total, decimal_time = _timed(_decimal_patti_total, rows)
+    assert str(fixed_total) == str(decimal_total), (fixed_total, decimal_total)
+    print(f"money: {count} Patti lines, total {fixed_total}")
+    print(f"  parse + calculate, integer paise : {fixed_time * 1000:8.1f} ms")
+    print(f"  parse + calculate, Decimal       : {decimal_time * 1000:8.1f} ms ({decimal_time / fixed_time:.2f}x)")
+
+    # Re-total already parsed lines, as a rate correction or export does
+    fixed_lines = [calculate_patti(row) for row in rows]
+    decimal_lines = [_decimal_patti(row) for row in rows]
+    fixed_total, fixed_time = _timed(_fixed_retotal, fixed_lines)
+    decimal_total, decimal_time = _timed(_decimal_retotal, decimal_lines)
+    assert str(fixed_total) == str(decimal_total), (fixed_total, decimal_total)
+    print(f"  re-total, integer paise          : {fixed_time * 1000:8.1f} ms")
+    print(f"  re-total, Decimal                : {decimal_time * 1000:8.1f} ms ({decimal_time / fixed_time:.2f}x)")
+
+
+def bench_rerate(count=100_000, invoices=500, lines=8):
+    """Vectorised rate correction over a day's worth of saved Patti lines, then through the journal."""
+    from dataclasses import replace
+
+    from invoice_journal import InvoiceJournal
+    from rerate import DayBook, ModeColumns
+
+    lines_parsed = [calculate_patti(row) for row in _patti_rows(count)]
+    columns = ModeColumns(
+        "Patti", range(count), [0] * count, ["CUSTOMER"] * count, [line.item for line in lines_parsed],
+        [line.billed for line in lines_parsed], [line.packets for line in lines_parsed],
+        [line.rate for line in lines_parsed], [line.hamali_rate for line in lines_parsed],
+        [line.amount for line in lines_parsed],
+    )
+    mask, select_time = _timed(columns.select, "MAIZE")
+    changed, rerate_time = _timed(columns.rerate, mask, 215000, 750)
+    print(f"rerate: {int(changed.sum())} of {count} lines changed")
+    print(f"  select        : {select_time * 1000:8.2f} ms")
+    print(f"  rerate        : {rerate_time * 1000:8.2f} ms")
+
+    model = InvoiceModel("Patti")
+    for row in _patti_rows(lines):
+        model.add_row(row)
+    invoice = model.invoice("CUSTOMER")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = InvoiceJournal(directory)
+        for number in range(1, invoices + 1):
+            journal.append(replace(invoice, number=number))
+        book, load_time = _timed(DayBook, journal, date.today())
+        changed, rerate_time = _timed(book.rerate, "MAIZE", "2150")
+        corrections, save_time = _timed(book.save)
+        assert all(line.rate == 215000 for _, saved in journal.records(date.today())
+                   for line in saved.lines)
+    print(f"  journal, {invoices} invoices: load {load_time * 1000:.1f} ms, rerate {rerate_time * 1000:.2f} ms, "
+          f"{len(corrections)} correction(s) appended in {save_time * 1000:.1f} ms")
+
+
+class _StubWidget:
+    """Stands in for a Tk widget or variable; counts grid() calls."""
+    grids = 0
+
+    def grid(self, **options):
+        _StubWidget.grids += 1
+
+    def grid_remove(self):
+        pass
+
+    def destroy(self):
+        pass
+
+    def set(self, *args):
+        pass
+
+    def configure(self, **options):
+        pass
+
+
+def _old_table(size, widgets):
+    """The old table's rows: a list of dicts, each with its row index and widgets."""
+    return [{"row_index": i, "widgets": [_StubWidget() for _ in range(widgets)]} for i in range(1, size + 1)]
+
+
+def _delete_middle_old(tables):
+    """The old delete_row: find the row by a linear scan, then re-grid every later row."""
+    for rows in tables:
+        while len(rows) > 1:
+            row_idx = rows[len(rows) // 2]["row_index"]
+            for i, row_data in enumerate(rows):
+                if row_data["row_index"] == row_idx:
+                    for widget in row_data["widgets"]:
+                        widget.destroy()
+                    rows.pop(i)
+                    break
+            for i, row_data in enumerate(rows, 1):
+                row_data["row_index"] = i
+                for j, widget in enumerate(row_data["widgets"]):
+                    widget.grid(row=i, column=j)
+
+
+def _headless_table(rows, visible):
+    """An InvoiceTable without Tk: stub widgets in visible slots, scrolled to the middle rows."""
+    from invoice_table import InvoiceTable, RowSlot
+
+    compiled = MODES["Patti"]
+    table = InvoiceTable.__new__(InvoiceTable)
+    table.model = InvoiceModel("Patti")
+    for row in rows:
+        table.model.add_row(row)
+    table.scrollbar = _StubWidget()
+    table._slot_by_row = {}
+    table._top = 0
+    table._binding = False
+    table._slots = []
+    for grid_row in range(1, visible + 1):
+        slot = RowSlot.__new__(RowSlot)
+        slot.table, slot.row_id, slot.grid_row, slot.visible, slot.shown = table, None, grid_row, False, {}
+        slot.vars = {col: _StubWidget() for col in range(compiled.cell_count) if col != compiled.computed_column}
+        slot.labels = {col: _StubWidget() for col in (compiled.computed_column, compiled.cell_count)
+                       if col is not None}
+        slot.amount_column = compiled.cell_count
+        slot.widgets = [_StubWidget() for _ in range(compiled.cell_count + 2)]
+        table._slots.append(slot)
+    table.scroll_to((len(rows) - visible) // 2)
+    return table
+
+
+def _delete_middle_slots(tables):
+    """InvoiceTable.delete_row on the row shown in the middle slot: only the slots below it are rebound."""
+    for table in tables:
+        while len(table.model) > 1:
+            table.delete_row(table._slots[min(len(table._slots), len(table.model)) // 2].row_id)
+
+
+def bench_delete(count=20, size=500, visible=15):
+    """Delete from the middle of 500-row invoices until one row is left."""
+    rows = _patti_rows(size)
+    deletes = count * (size - 1)
+    widgets = MODES["Patti"].cell_count + 2  # the cells, the amount and the delete button
+
+    tables = [_old_table(size, widgets) for _ in range(count)]
+    _StubWidget.grids = 0
+    _, old_time = _timed(_delete_middle_old, tables)
+    old_grids = _StubWidget.grids
+
+    tables = [_headless_table(rows, visible) for _ in range(count)]
+    _StubWidget.grids = 0
+    _, new_time = _timed(_delete_middle_slots, tables)
+    new_grids = _StubWidget.grids
+
+    print(f"delete: {deletes} deletes from the middle of {count} tables of {size} rows ({visible} on screen)")
+    print(f"  scan + re-grid every row : {old_time / deletes * 1e6:8.2f} us/delete, "
+          f"{old_grids / deletes:7.1f} grid() calls/delete")
+    print(f"  rebind slots below       : {new_time / deletes * 1e6:8.2f} us/delete, "
+          f"{new_grids / deletes:7.1f} grid() calls/delete ({old_time / new_time:.1f}x)")
+
+
+def bench_journal(count=2000, lines=8):
+    """Per-save cost of appending invoices to a day's journal, early and late in the day."""
+    from invoice_journal import InvoiceJournal
+
+    rows = _patti_rows(lines)
+    model = InvoiceModel("Patti")
+    for row in rows:
+        model.add_row(row)
+    invoice = model.invoice("CUSTOMER")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = InvoiceJournal(directory)
+        times = [_timed(journal.append, invoice)[1] for _ in range(count)]
+        size = os.path.getsize(journal.path_for(date.today()))
+    print(f"journal: {count} saves of {lines}-line invoices ({size / count:.0f} bytes/save)")
+    print(f"  first 100 saves : {sum(times[:100]) / 100 * 1000:8.3f} ms/save")
+    print(f"  last 100 saves  : {sum(times[-100:]) / 100 * 1000:8.3f} ms/save")
+
+
+def _export_in_memory(records, path):
+    """The old export: a normal Workbook holding every cell until save."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    sheets = {}
+    for when, invoice in records:
+        ws = sheets.get(invoice.mode)
+        if ws is None:
+            ws = sheets[invoice.mode] = wb.create_sheet(title=invoice.mode)
+            ws.append(["Timestamp", "Customer"] + MODES[invoice.mode].headers)
+        for line in invoice.lines:
+            ws.append([when.strftime("%Y-%m-%d %H:%M:%S"), invoice.customer] + line.row_values())
+    wb.save(path)
+
+
+def _peak_memory(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_export(count=2000, lines=8):
+    """Exporting a month's invoices: in-memory Workbook against the streaming write-only export."""
+    from workbook_export import write_workbook
+
+    model = InvoiceModel("Patti")
+    for row in _patti_rows(lines):
+        model.add_row(row)
+    invoice = model.invoice("CUSTOMER")
+    records = [(datetime(2024, 6, 1 + i % 30, 10), invoice) for i in range(count)]
+    rows = count * lines
+    print(f"export: {count} invoices, {rows} rows")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.xlsx")
+        for name, export in (("in-memory", _export_in_memory), ("streaming", write_workbook)):
+            _, seconds = _timed(export, records, path)
+            peak = _peak_memory(export, records, path)
+            print(f"  {name:9}: {rows / seconds:8.0f} rows/s, peak {peak / 2**20:6.1f} MiB")
+
+
+def _repaint_texts(model, row_ids):
+    """The headless half of a table repaint: every text a visible row shows."""
+    compiled = model.compiled_mode
+    for row_id in row_ids:
+        line = model.line(row_id)
+        model.cells(row_id)
+        f"₹{Money(line.amount):.2f}"
+        if compiled.computed_column is not None:
+            f"{line.computed:.2f}"
+
+
+def bench_snapshot(sizes=(10, 100, 1000), repeat=2000, visible=15):
+    """Taking an invoice snapshot on the UI thread, against repainting one screenful of rows."""
+    print(f"snapshot: per call, {repeat} calls; repaint = formatting {visible} visible rows")
+    for size in sizes:
+        model = InvoiceModel("Patti")
+        for row in _patti_rows(size):
+            model.add_row(row)
+        model.add_row()  # the blank row the table keeps for the next line
+        row_ids = model.row_ids()
+        visible_ids = row_ids[:visible]
+        first = row_ids[0]
+
+        def cached():
+            for _ in range(repeat):
+                model.snapshot("CUSTOMER")
+
+        def after_edit():
+            for i in range(repeat):
+                model.set_cell(first, 1, str(i % 7 + 1))
+                model.snapshot("CUSTOMER")
+
+        def repaint():
+            for _ in range(repeat):
+                _repaint_texts(model, visible_ids)
+
+        _, cached_time = _timed(cached)
+        _, edit_time = _timed(after_edit)
+        _, repaint_time = _timed(repaint)
+        print(f"  {size:5} rows: unchanged {cached_time / repeat * 1e6:7.2f} us, "
+              f"after an edit {edit_time / repeat * 1e6:7.2f} us, repaint {repaint_time / repeat * 1e6:7.2f} us")
+
+
+BENCHMARKS = {
+    "money": bench_money,
+    "rerate": bench_rerate,
+    "delete": bench_delete,
+    "journal": bench_journal,
+    "snapshot": bench_snapshot,
+    "export": bench_export,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,184 @@
+"""Write-ahead log of the invoices being typed, for crash recovery.
+
+Records:
+    ["row", mode, row_id, cells]   a row with its cells
+    ["set", mode, row_id, column, text]
+    ["del", mode, row_id]
+    ["clear", mode]
+    ["kata", mode, paise]
+    ["cust", text]
+    ["draft", mode, draft_id]      names the mode's draft, for SavedHashes; reset by "clear"
+    ["saved", mode, seq]           the mode's first seq records were saved
+"""
+import json
+import logging
+import os
+import threading
+from collections import namedtuple
+
+CHECKPOINT_BYTES = 1 << 20  # rewrite the log once this much has been appended since the last checkpoint
+
+Draft = namedtuple("Draft", "rows kata_amount unsaved draft_id")  # rows: [(row_id, cells)] in display order
+Recovery = namedtuple("Recovery", "customer drafts")     # drafts: mode -> Draft
+
+
+def model_records(model):
+    """The records that recreate a model's current rows and Kata amount, for a checkpoint."""
+    records = [["clear", model.mode]]
+    if model.kata_amount:
+        records.append(["kata", model.mode, int(model.kata_amount)])
+    for row_id in model.order:
+        records.append(["row", model.mode, row_id, model.cells(row_id)])
+    return records
+
+
+class DraftLog:
+    """Append-only draft journal with batched fsync; thread-safe."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._checkpoint = None   # records to restart the file with, at the next flush
+        self._seq = {}            # mode -> records logged for it since the file began
+        self._generation = 0      # bumped by each checkpoint, which restarts the counts
+        self._clean = set()       # modes with no change since their last save
+        self.appended_bytes = 0
+        self.appends = 0
+        self.syncs = 0
+
+    def seq(self, mode):
+        """Position of the mode's latest record; pass it to saved() once that state is on disk."""
+        with self._lock:
+            return self._generation, self._seq.get(mode, 0)
+
+    def is_saved(self, mode):
+        """True if the mode has not changed since its last save."""
+        with self._lock:
+            return mode in self._clean
+
+    def _add(self, record):
+        if record[0] not in ("cust", "draft"):
+            mode = record[1]
+            count = self._seq.get(mode, 0)
+            self._seq[mode] = count + 1
+            # Saved as of the latest edit, or edited since (including after the state that was saved)
+            if record[0] == "saved" and record[2] == count:
+                self._clean.add(mode)
+            else:
+                self._clean.discard(mode)
+        text = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._buffer.append(text)
+        self.appended_bytes += len(text)
+
+    def append(self, record):
+        with self._lock:
+            self._add(record)
+            self.appends += 1
+
+    def saved(self, mode, seq):
+        """Mark the mode's state as of seq as saved for good.
+
+        Edits logged after seq stay unsaved: the mode only counts as clean if
+        nothing was logged for it since.
+        """
+        generation, count = seq
+        with self._lock:
+            # A checkpoint since then renumbered the records; leave the mode looking unsaved
+            if generation == self._generation:
+                self._add(["saved", mode, count])
+
+    def needs_checkpoint(self):
+        return self.appended_bytes > CHECKPOINT_BYTES
+
+    def checkpoint(self, records):
+        """Restart the log from these records (the whole current state) at the next flush."""
+        with self._lock:
+            self._buffer = []
+            self._seq = {}
+            self._generation += 1
+            self.appended_bytes = 0
+            clean, self._clean = self._clean, set()
+            for record in records:
+                self._add(record)
+            for mode in clean:
+                # Still saved: the checkpoint must not make it look unsaved
+                self._add(["saved", mode, self._seq.get(mode, 0)])
+            self._checkpoint, self._buffer = self._buffer, []
+
+    def flush(self):
+        """Write and fsync what has been appended (call from the persistence worker)."""
+        with self._lock:
+            checkpoint, self._checkpoint = self._checkpoint, None
+            buffer, self._buffer = self._buffer, []
+        if checkpoint is None and not buffer:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if checkpoint is not None:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(checkpoint)
+                f.writelines(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+        self.syncs += 1
+
+    def replay(self):
+        """Rebuild every mode's draft from the log; None if there is no log."""
+        if not os.path.exists(self.path):
+            return None
+        customer = ""
+        rows = {}       # mode -> {row_id: cells}, in display order
+        kata = {}
+        draft_ids = {}
+        seq = {}
+        saved = {}
+        with open(self.path, encoding="utf-8") as f:
+            for text in f:
+                try:
+                    record = json.loads(text)
+                except ValueError:
+                    logging.warning(f"{self.path}: skipping torn record")
+                    continue
+                op = record[0]
+                if op == "cust":
+                    customer = record[1]
+                    continue
+                if op == "draft":
+                    draft_ids[record[1]] = record[2]
+                    continue
+                mode = record[1]
+                seq[mode] = seq.get(mode, 0) + 1
+                mode_rows = rows.setdefault(mode, {})
+                if op == "row":
+                    mode_rows[record[2]] = list(record[3])
+                elif op == "set":
+                    cells = mode_rows.get(record[2])
+                    if cells is not None and record[3] < len(cells):
+                        cells[record[3]] = record[4]
+                elif op == "del":
+                    mode_rows.pop(record[2], None)
+                elif op == "clear":
+                    mode_rows.clear()
+                    draft_ids.pop(mode, None)
+                elif op == "kata":
+                    kata[mode] = record[2]
+                elif op == "saved":
+                    saved[mode] = record[2]
+        with self._lock:
+            self._seq = seq
+            self._clean = {mode for mode, count in saved.items() if seq.get(mode) == count + 1}
+        drafts = {}
+        for mode, mode_rows in rows.items():
+            has_content = any(cells[0].strip() for cells in mode_rows.values())
+            unsaved = has_content and seq.get(mode, 0) > saved.get(mode, 0) + 1  # +1: the saved record itself
+            drafts[mode] = Draft(list(mode_rows.items()), kata.get(mode, 0), unsaved, draft_ids.get(mode))
+        return Recovery(customer, drafts)
@@ -0,0 +1,689 @@
+"""Headless invoice calculations shared by the UI, Excel writer and receipt printer.
+
+Nothing in here touches Tk: the UI hands over the raw cell texts of a row once,
+and every consumer works from the resulting line records.
+
+All arithmetic is exact integer fixed point: money in paise, weights in grams,
+packets in thousandths and percentages in hundredths. Products are rounded
+half away from zero once, where they are formed, so the screen, the workbook
+and the receipt always agree to the paisa.
+"""
+import hashlib
+import json
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property, lru_cache, partial
+from operator import itemgetter
+
+RECEIPT_WIDTH = 48  # Characters per line on the receipt printer
+
+_SCALES = [10 ** n for n in range(19)]
+_FLOAT_SPEC = re.compile(r"(.*?)(?:\.(\d+))?f")
+
+
+@lru_cache(maxsize=8192)
+def parse_fixed(text, places):
+    """Parse a decimal string into an integer scaled by 10**places, 0 if invalid."""
+    whole, _, decimals = text.strip().partition(".")
+    try:
+        if len(decimals) <= places:
+            # Pad the decimals out to places digits: the digits are the scaled integer
+            return int(whole + decimals + "0" * (places - len(decimals)))
+        # More decimals than we keep: round half away from zero on the dropped digits
+        return round_div(int(whole + decimals), _SCALES[len(decimals) - places])
+    except ValueError:
+        return 0
+
+
+def round_div(numerator, denominator):
+    """Integer division rounded half away from zero."""
+    quotient = (abs(numerator) * 2 + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+def format_fixed(value, places, digits):
+    """Format an integer scaled by 10**places with the given number of decimals."""
+    if digits < places:
+        value = round_div(value, 10 ** (places - digits))
+    elif digits > places:
+        value *= 10 ** (digits - places)
+    sign = "-" if value < 0 else ""
+    whole, frac = divmod(abs(value), 10 ** digits)
+    return f"{sign}{whole}.{frac:0{digits}d}" if digits else f"{sign}{whole}"
+
+
+class Fixed(int):
+    """Integer fixed-point value; PLACES is the number of implied decimals.
+
+    Arithmetic falls through to plain int (fast, exact). Formatting with a
+    float spec such as ``f"{amount:.2f}"`` renders the exact decimal value.
+    """
+    __slots__ = ()
+    PLACES = 0
+
+    @classmethod
+    def parse(cls, text):
+        return cls(parse_fixed(text, cls.PLACES))
+
+    def __str__(self):
+        return format_fixed(self, self.PLACES, self.PLACES)
+
+    def __repr__(self):
+        return f"{type(self).__name__}('{self}')"
+
+    def __format__(self, spec):
+        match = _FLOAT_SPEC.fullmatch(spec)
+        if match is None:
+            return format(str(self), spec)
+        align, digits = match.groups()
+        digits = self.PLACES if digits is None else int(digits)
+        return format(format_fixed(self, self.PLACES, digits), align)
+
+
+class Money(Fixed):
+    """Rupees held as integer paise."""
+    __slots__ = ()
+    PLACES = 2
+
+
+class Weight(Fixed):
+    """Kilograms held as integer grams."""
+    __slots__ = ()
+    PLACES = 3
+
+
+# --- Mode registry ---------------------------------------------------------
+#
+# Each invoice mode is declared once as data: its table columns, how the
+# billed weight and the hamali packets follow from the inputs, and its receipt
+# layout. compile_mode turns a spec into the calculator, line record type and
+# receipt formatter used on the hot paths, so nothing downstream compares
+# mode names.
+
+
+@dataclass(frozen=True)
+class Column:
+    """A table column. Inputs are typed; the computed column shows the billed weight."""
+    header: str
+    name: str
+    places: int = 0      # Implied decimals when parsing an input
+    computed: bool = False
+
+
+@dataclass(frozen=True)
+class Formula:
+    """A function of some input columns, named by its parameters."""
+    fn: object
+    columns: tuple
+
+
+def formula(fn):
+    """Wrap a function whose parameter names are the input columns it reads."""
+    code = fn.__code__
+    return Formula(fn, code.co_varnames[:code.co_argcount])
+
+
+def hamali_per_packet(column):
+    """Hamali packets are typed in a column (thousandths of a packet)."""
+    return Formula(lambda packets: packets, (column,))
+
+
+def hamali_per_weight(column, kg_per_packet):
+    """Hamali packets are whole kg_per_packet bags of a weight column."""
+    grams = kg_per_packet * 1000
+    return Formula(lambda weight: (weight // grams) * 1000 if weight > 0 else 0, (column,))
+
+
+@dataclass(frozen=True)
+class ReceiptColumn:
+    """One receipt column: an input shown as typed, or a computed value formatted."""
+    header: str
+    field: str
+    spec: str = ""       # Format spec for computed values, e.g. ".2f"
+    clip: int = 0        # Truncate to this many characters (0 = no limit)
+
+
+@dataclass(frozen=True)
+class ModeSpec:
+    """Declarative definition of an invoice mode.
+
+    billed: grams billed at the Rate column.
+    hamali: packets (thousandths) charged at the Hamali rate column.
+    """
+    name: str
+    columns: tuple
+    billed: Formula
+    hamali: Formula
+    receipt_format: str
+    receipt_columns: tuple
+    kata_deduction: bool = False  # Invoice carries a Kata amount deducted from the total
+
+
+class LineMixin:
+    """Shared behaviour of the generated per-mode line records."""
+    __slots__ = ()
+    compiled_mode = None  # CompiledMode, set on each generated class
+
+    @property
+    def computed(self):
+        """The computed column's value (Final Wt / Total Qty), None if the mode shows none."""
+        mode = self.compiled_mode
+        return Weight(getattr(self, mode.billed_field)) if mode.computed_column is not None else None
+
+    def row_values(self):
+        """Item, every column as shown in the table, then the amount."""
+        return self.compiled_mode.row_values(self)
+
+    def typed_values(self):
+        """row_values with numbers instead of texts (for spreadsheet cells)."""
+        return self.compiled_mode.typed_values(self)
+
+    def receipt_row(self):
+        return self.compiled_mode.format_receipt_row(self)
+
+
+class CompiledMode:
+    """A ModeSpec compiled into direct-call calculator and formatter callables."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.name
+        self.kata_deduction = spec.kata_deduction
+        # Table headers: every column plus the amount label
+        self.headers = [c.header for c in spec.columns] + ["Amount"]
+        self.column_names = [c.name for c in spec.columns]
+        self.cell_count = len(spec.columns)
+        self.computed_column = next((i for i, c in enumerate(spec.columns) if c.computed), None)
+
+        inputs = [(i, c) for i, c in enumerate(spec.columns[1:], 1) if not c.computed]
+        input_names = [c.name for _, c in inputs]
+        self.input_indexes = tuple(i for i, _ in inputs)
+        self.input_places = tuple(c.places for _, c in inputs)
+        self._input_scales = tuple(_SCALES[places] for places in self.input_places)
+        self.billed_field = (spec.columns[self.computed_column].name
+                             if self.computed_column is not None else "billed")
+
+        # Numbers are plain ints (grams, thousandths, paise); Money and Weight wrap them to be shown
+        fields = ["item", "texts", *input_names, self.billed_field, "packets", "hamali", "amount"]
+        self.line_type = type(f"{spec.name}Line", (namedtuple(f"{spec.name}Fields", fields), LineMixin),
+                              {"__slots__": (), "compiled_mode": self})
+
+        self._billed = self._bind(spec.billed, input_names)
+        self._packets = self._bind(spec.hamali, input_names)
+        self._rate = input_names.index("rate")
+        self._hamali_rate = input_names.index("hamali_rate")
+        self.calculate = self._compile_calculator()
+
+        self.receipt_header = spec.receipt_format.format(*(c.header for c in spec.receipt_columns))
+        self.format_receipt_row = self._compile_receipt_formatter(input_names)
+
+    @staticmethod
+    def _bind(formula, input_names):
+        """Turn a Formula into a callable on the tuple of parsed input values."""
+        positions = [input_names.index(name) for name in formula.columns]
+        fn = formula.fn
+        if len(positions) == 1:
+            (position,) = positions
+            return lambda values: fn(values[position])
+        getter = itemgetter(*positions)
+        return lambda values: fn(*getter(values))
+
+    def _compile_calculator(self):
+        billed, packets_of = self._billed, self._packets
+        rate_at, hamali_rate_at = self._rate, self._hamali_rate
+        make_line = self.line_type._make
+        inputs_of = itemgetter(*self.input_indexes)  # every mode has at least a rate and a hamali rate
+        # One cached parser per input column: a one-argument cache lookup is cheaper than parse_fixed's
+        parsers = tuple(lru_cache(maxsize=8192)(partial(parse_fixed.__wrapped__, places=places))
+                        for places in self.input_places)
+
+        def calculate(cells):
+            """Parse a row's cells (item first, computed column ignored) into a line."""
+            texts = tuple([text.strip() for text in inputs_of(cells)])
+            values = [parse(text) for parse, text in zip(parsers, texts)]
+            quantity = billed(values)
+            packets = packets_of(values)
+            # Hamali is charged per packet and deducted from the amount
+            hamali = round_div(packets * values[hamali_rate_at], 1000)
+            amount = round_div(quantity * values[rate_at], 1000) - hamali
+            return make_line((cells[0].strip(), texts, *values, quantity, packets, hamali, amount))
+
+        return calculate
+
+    def _compile_receipt_formatter(self, input_names):
+        getters = []
+        for column in self.spec.receipt_columns:
+            if column.field == "item":
+                getters.append(lambda line, clip=column.clip: line.item[:clip] if clip else line.item)
+            elif column.field in input_names:
+                getters.append(lambda line, i=input_names.index(column.field): line.texts[i])
+            else:
+                kind = Weight if column.field == self.billed_field else Money
+                getters.append(lambda line, f=column.field, s=column.spec, kind=kind:
+                               format(kind(getattr(line, f)), s))
+        fmt = self.spec.receipt_format.format
+
+        def format_receipt_row(line):
+            return fmt(*[get(line) for get in getters])
+
+        return format_receipt_row
+
+    def cells_of(self, item, texts):
+        """A row's cells from its item and input texts (computed column left blank)."""
+        cells = [""] * self.cell_count
+        cells[0] = item
+        for i, text in zip(self.input_indexes, texts):
+            cells[i] = text
+        return cells
+
+    def row_values(self, line):
+        values = [line.item, *line.texts]
+        if self.computed_column is not None:
+            values.insert(self.computed_column, f"{line.computed:.2f}")
+        values.append(f"{Money(line.amount):.2f}")
+        return values
+
+    def typed_values(self, line):
+        values = [line.item]
+        values.extend(value / scale for value, scale in zip(line[2:], self._input_scales))
+        if self.computed_column is not None:
+            values.insert(self.computed_column, line.computed / _SCALES[Weight.PLACES])
+        values.append(line.amount / _SCALES[Money.PLACES])
+        return values
+
+
+MODE_SPECS = (
+    ModeSpec(
+        name="Patti",
+        columns=(
+            Column("Item", "item"),
+            Column("Packet", "packet", places=3),
+            Column("Quantity", "quantity", places=3),
+            Column("+", "plus", places=3),
+            Column("Rate", "rate", places=2),
+            Column("Hamali", "hamali_rate", places=2),
+        ),
+        billed=formula(lambda quantity, plus: quantity + plus),
+        hamali=hamali_per_packet("packet"),
+        receipt_format="{:<8} {:>4} {:>5} {:>7} {:>6}{:>14}",
+        receipt_columns=(
+            ReceiptColumn("Item", "item", clip=8),
+            ReceiptColumn("Pkt", "packet"),
+            ReceiptColumn("Qty", "quantity"),
+            ReceiptColumn("Rate", "rate"),
+            ReceiptColumn("Hm", "hamali", ".0f"),
+            ReceiptColumn("Amount", "amount", ".2f"),
+        ),
+    ),
+    ModeSpec(
+        name="Kata",
+        columns=(
+            Column("Item", "item"),
+            Column("Net Wt", "net", places=3),
+            Column("Less%", "less", places=2),
+            Column("Final Wt", "final_wt", computed=True),
+            Column("Rate", "rate", places=2),
+            Column("Hamali Rate", "hamali_rate", places=2),
+        ),
+        billed=formula(lambda net, less: round_div(net * (10000 - less), 10000) if less < 10000 else 0),
+        # Packets are counted from the net weight at 60kg/packet
+        hamali=hamali_per_weight("net", 60),
+        # Narrower Item column, Net closer, Amount inside border
+        receipt_format="{:<9}{:>6} {:>7}{:>6}{:>6}{:>10}",
+        receipt_columns=(
+            ReceiptColumn("Item", "item", clip=9),
+            ReceiptColumn("Net", "net"),
+            ReceiptColumn("FWt", "final_wt", ".2f"),
+            ReceiptColumn("Rt", "rate"),
+            ReceiptColumn("Hm", "hamali", ".0f"),
+            ReceiptColumn("Amount", "amount", ".2f"),
+        ),
+        kata_deduction=True,
+    ),
+    ModeSpec(
+        name="Barthe",
+        columns=(
+            Column("Item", "item"),
+            Column("Packet", "packet", places=3),
+            Column("Weight", "weight", places=3),
+            Column("+", "adjustment", places=3),
+            Column("Total Qty", "total_qty", computed=True),
+            Column("Rate", "rate", places=2),
+            Column("Hamali", "hamali_rate", places=2),
+        ),
+        billed=formula(lambda packet, weight, adjustment: round_div(packet * weight, 1000) + adjustment),
+        hamali=hamali_per_packet("packet"),
+        receipt_format="{:<8}{:>5}{:>6}{:>8}{:>5}{:>6}{:>10}",
+        receipt_columns=(
+            ReceiptColumn("Item", "item", clip=8),
+            ReceiptColumn("Pkt", "packet"),
+            ReceiptColumn("Wt", "weight"),
+            ReceiptColumn("TQty", "total_qty", ".2f"),
+            ReceiptColumn("Rt", "rate"),
+            ReceiptColumn("Hm", "hamali", ".0f"),
+            ReceiptColumn("Amount", "amount", ".2f"),
+        ),
+    ),
+)
+
+MODES = {}  # mode name -> CompiledMode, in button order
+
+
+def register_mode(spec):
+    """Compile a mode spec and make it available everywhere (call at startup)."""
+    compiled = CompiledMode(spec)
+    MODES[spec.name] = compiled
+    return compiled
+
+
+for _spec in MODE_SPECS:
+    register_mode(_spec)
+
+
+@dataclass(frozen=True)
+class Invoice:
+    """A parsed invoice: the lines with an item plus the Kata deduction."""
+    customer: str
+    mode: str
+    lines: tuple
+    kata_amount: Money = Money(0)
+    number: int = None  # invoice number, given when it is saved
+
+    @property
+    def line_total(self):
+        return Money(sum(line.amount for line in self.lines))
+
+    @property
+    def total(self):
+        return Money(self.line_total - self.kata_amount)
+
+    @cached_property
+    def content_hash(self):
+        """Hex digest of what was typed (customer, mode, Kata, items and inputs); equal invoices, equal hashes."""
+        content = [self.customer, self.mode, int(self.kata_amount), [[line.item, *line.texts] for line in self.lines]]
+        data = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def build_invoice(customer, mode, lines, kata_amount=Money(0), number=None):
+    """Keep only lines with an item name; rows without one are never saved or printed."""
+    return Invoice(customer, mode, tuple(line for line in lines if line.item), kata_amount, number)
+
+
+class RowOrder:
+    """Row ids in display order, indexed both ways.
+
+    Rows are only ever appended and ids only ever grow, so the live ids stay
+    sorted: "where is row r" is a bisect and "which row is at position p" is
+    a list index. Deleting shifts the tail with one memmove instead of a
+    Python-level search and re-grid of every later row.
+    """
+
+    def __init__(self, row_ids=()):
+        self._ids = sorted(row_ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, row_id):
+        i = bisect_left(self._ids, row_id)
+        return i < len(self._ids) and self._ids[i] == row_id
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __getitem__(self, position):
+        return self._ids[position]
+
+    def append(self, row_id):
+        if self._ids and row_id <= self._ids[-1]:
+            raise ValueError(f"row id {row_id} is not newer than {self._ids[-1]}")
+        self._ids.append(row_id)
+
+    def position(self, row_id):
+        """Display position of a row."""
+        i = bisect_left(self._ids, row_id)
+        if i == len(self._ids) or self._ids[i] != row_id:
+            raise KeyError(row_id)
+        return i
+
+    def remove(self, row_id):
+        del self._ids[self.position(row_id)]
+
+    def clear(self):
+        self._ids.clear()
+
+    def window(self, start, count):
+        """Up to count row ids from display position start onwards."""
+        return self._ids[max(0, start):max(0, start) + max(0, count)]
+
+
+class InvoiceModel:
+    """Live rows of the invoice being edited, recomputed one row at a time.
+
+    Every cell edit re-parses only its own row and moves the running total by
+    the change in that row's amount, so an edit costs the same however many
+    rows the invoice has.
+
+    snapshot() hands background work (save, print, export) an immutable
+    Invoice. It is built at most once per change and otherwise returned from
+    cache, so taking one on the UI thread costs microseconds. The lines are
+    also kept in display order as edits happen, so rebuilding it after an
+    edit is a C-level list copy rather than a pass over every row.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.compiled_mode = MODES[mode]
+        self._calculate = self.compiled_mode.calculate
+        self._cell_count = self.compiled_mode.cell_count
+        self._computed_column = self.compiled_mode.computed_column
+        self._cells = {}  # row_id -> list of cell texts
+        self._lines = {}  # row_id -> line record
+        self._in_order = []  # every row's line, in display order
+        self._blank = set()  # ids of rows without an item (left out of invoices)
+        self.order = RowOrder()  # row ids in display order
+        self.draft = 1  # which invoice this is; bumped by clear() when the next one starts
+        self.version = 0  # bumped by every change to the rows or the Kata amount
+        self._next_id = 1
+        self.line_total = 0  # paise
+        self._kata_amount = Money(0)
+        self._snapshot = None  # Invoice of the current lines, until the next change
+        self._reopened = None  # number of the saved invoice these rows correct, if any
+        self.listener = None   # called with (op, mode, *args) for every change, e.g. to log it
+
+    def __len__(self):
+        return len(self._lines)
+
+    @property
+    def kata_amount(self):
+        return self._kata_amount
+
+    @kata_amount.setter
+    def kata_amount(self, value):
+        if value != self._kata_amount:
+            self._kata_amount = Money(value)
+            self._changed()
+            if self.listener:
+                self.listener("kata", self.mode, int(value))
+
+    @property
+    def total(self):
+        return Money(self.line_total - self.kata_amount)
+
+    @property
+    def reopened(self):
+        """Number of the saved invoice these rows were reopened from; clear() forgets it."""
+        return self._reopened
+
+    @reopened.setter
+    def reopened(self, number):
+        self._reopened = number
+        self._snapshot = None
+
+    def add_row(self, cells=None, row_id=None):
+        """Add a row (blank unless cells are given) and return its id.
+
+        row_id restores a row under the id it had before (crash recovery).
+        """
+        if row_id is None:
+            row_id = self._next_id
+        self._next_id = max(self._next_id, row_id + 1)
+        row_cells = [""] * self._cell_count
+        if cells:
+            row_cells[:len(cells)] = cells[:self._cell_count]
+        line = self._calculate(row_cells)
+        self._cells[row_id] = row_cells
+        self._lines[row_id] = line
+        self.order.append(row_id)
+        self._in_order.append(line)
+        if not line.item:
+            self._blank.add(row_id)
+        self.line_total += line.amount
+        self._changed()
+        if self.listener:
+            self.listener("row", self.mode, row_id, row_cells)
+        return row_id
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot = None
+
+    def set_cell(self, row_id, column, text):
+        """Update one cell and return the row's new line, or None if nothing changed."""
+        if not self.set_text(row_id, column, text):
+            return None
+        return self.recompute(row_id)
+
+    def set_text(self, row_id, column, text):
+        """Store a cell's text without recomputing; True if the row now needs recompute()."""
+        if column == self._computed_column:
+            return False
+        cells = self._cells[row_id]
+        if cells[column] == text:
+            return False
+        cells[column] = text
+        self._changed()
+        if self.listener:
+            self.listener("set", self.mode, row_id, column, text)
+        return True
+
+    def recompute(self, row_id):
+        """Re-parse a row from its cells, move the total by its change and return the new line."""
+        cells = self._cells[row_id]
+        old = self._lines[row_id]
+        line = self._calculate(cells)
+        self._lines[row_id] = line
+        self._in_order[self.order.position(row_id)] = line
+        if line.item:
+            self._blank.discard(row_id)
+        else:
+            self._blank.add(row_id)
+        self.line_total += line.amount - old.amount
+        self._snapshot = None
+        return line
+
+    def remove_row(self, row_id):
+        line = self._lines.pop(row_id)
+        del self._cells[row_id]
+        del self._in_order[self.order.position(row_id)]
+        self._blank.discard(row_id)
+        self.order.remove(row_id)
+        self.line_total -= line.amount
+        self._changed()
+        if self.listener:
+            self.listener("del", self.mode, row_id)
+
+    def clear(self):
+        self._cells.clear()
+        self._lines.clear()
+        self._in_order.clear()
+        self._blank.clear()
+        self.order.clear()
+        self.line_total = 0
+        self.draft += 1
+        self._reopened = None
+        self._changed()
+        if self.listener:
+            self.listener("clear", self.mode)
+
+    def row_ids(self):
+        """Row ids in display order."""
+        return list(self.order)
+
+    def cells(self, row_id):
+        """The row's cell texts as last typed (do not modify)."""
+        return self._cells[row_id]
+
+    def line(self, row_id):
+        return self._lines[row_id]
+
+    def lines(self):
+        return tuple(self._lines.values())
+
+    def invoice(self, customer):
+        """Freeze the current rows into an Invoice without re-parsing anything.
+
+        A reopened invoice keeps its number, so saving it corrects the saved one.
+        """
+        lines = self._in_order
+        if self._blank:
+            # Copy the runs between blank rows (usually just the last row is blank)
+            kept, start = [], 0
+            for position in sorted(map(self.order.position, self._blank)):
+                kept += lines[start:position]
+                start = position + 1
+            kept += lines[start:]
+            lines = kept
+        return Invoice(customer, self.mode, tuple(lines), self.kata_amount, self._reopened)
+
+    def snapshot(self, customer):
+        """The current rows as an immutable Invoice, rebuilt only if something changed.
+
+        Lines of cells typed since the last recompute() are not in it yet:
+        flush pending recomputes first.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.customer != customer:
+            snapshot = self._snapshot = self.invoice(customer)
+        return snapshot
+
+
+def render_receipt(invoice, when=None, max_width=RECEIPT_WIDTH):
+    """Render the printer lines for an invoice (last line is the cut command)."""
+    when = when or datetime.now()
+    customer = invoice.customer or "N/A"
+    lines = []
+
+    # Header
+    lines.append("G.V. Mahant Brothers".center(max_width))
+    lines.append(when.strftime("%d-%b-%Y %H:%M").center(max_width))
+    if invoice.number is not None:
+        lines.append(f"Invoice No: {invoice.number}".center(max_width))
+    lines.append(f"Customer Name: {customer}".center(max_width))
+    lines.append("-" * max_width)
+    mode = MODES.get(invoice.mode)
+    if mode:
+        lines.append(mode.receipt_header)
+    else:
+        lines.append("Unknown mode".center(max_width))
+    lines.append("-" * max_width)
+
+    if mode:
+        for line in invoice.lines:
+            lines.append(mode.format_receipt_row(line))
+
+    if mode and mode.kata_deduction:
+        lines.append(f"    Kata Amount:{invoice.kata_amount:>30.2f}")
+
+    lines.append("-" * max_width)
+    # Indent and center Total Amount
+    lines.append(f"Total Amount: {invoice.total:.2f}".center(max_width))
+    lines.append("-" * max_width)
+    lines.extend(["\n"] * 3)
+    lines.append(chr(27) + chr(105))  # Cut command
+
+    return lines
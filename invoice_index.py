@@ -0,0 +1,119 @@
+"""Invoice numbers, and where each numbered invoice is in the journal (binary search over fixed-size records)."""
+import logging
+import mmap
+import os
+import struct
+import threading
+from datetime import date
+
+RECORD = struct.Struct("<QIQ")  # invoice number, day (date.toordinal()), byte offset in that day's journal
+
+
+class InvoiceIndex:
+    """Allocates invoice numbers and maps them to (day, offset); thread-safe."""
+
+    def __init__(self, path, counter_path=None):
+        self.path = path
+        # The last number handed out, kept apart from the index (e.g. on the local disk) so that
+        # invoices saved to the Desktop fallback, or while the index is missing, never share a number
+        self.counter_path = counter_path
+        self._lock = threading.Lock()
+        self._last = None  # (number, day, offset) of the last record, once read
+        self._allocated = None  # highest number handed out, indexed or not, once read
+
+    def _last_record(self):
+        if self._last is None:
+            self._last = (0, 0, 0)
+            if os.path.exists(self.path):
+                size = os.path.getsize(self.path)
+                size -= size % RECORD.size  # a torn last record is ignored
+                if size:
+                    with open(self.path, "rb") as f:
+                        f.seek(size - RECORD.size)
+                        self._last = RECORD.unpack(f.read(RECORD.size))
+        return self._last
+
+    def _read_counter(self):
+        try:
+            with open(self.counter_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (TypeError, OSError, ValueError):
+            return 0
+
+    def _write_counter(self, number):
+        if self.counter_path is None:
+            return
+        tmp_path = self.counter_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{number}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.counter_path)
+
+    def allocate(self):
+        """A new invoice number, higher than any handed out or indexed before."""
+        with self._lock:
+            if self._allocated is None:
+                self._allocated = self._read_counter()
+            number = max(self._allocated, self._last_record()[0]) + 1
+            try:
+                self._write_counter(number)
+            except OSError as e:
+                logging.error(f"Error saving the invoice number counter {self.counter_path}: {e}")
+            self._allocated = number
+            return number
+
+    def add(self, number, day, offset):
+        """Record where invoice number was saved; numbers must be added in increasing order."""
+        with self._lock:
+            if number <= self._last_record()[0]:
+                raise ValueError(f"Invoice number {number} is not after {self._last[0]}")
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as f:
+                end = f.seek(0, os.SEEK_END)
+                if end % RECORD.size:
+                    f.truncate(end - end % RECORD.size)  # drop a torn record
+                f.write(RECORD.pack(number, day.toordinal(), offset))
+            self._last = (number, day.toordinal(), offset)
+
+    def locate(self, number):
+        """(day, offset) of invoice number in the journal, or None if it was never indexed."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            count = os.fstat(f.fileno()).st_size // RECORD.size
+            if not count:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if RECORD.unpack_from(data, middle * RECORD.size)[0] < number:
+                        low = middle + 1
+                    else:
+                        high = middle
+                if low == count:
+                    return None
+                found, day, offset = RECORD.unpack_from(data, low * RECORD.size)
+        return (date.fromordinal(day), offset) if found == number else None
+
+    def catch_up(self, journal):
+        """Index numbered journal records saved after the last indexed one; returns how many."""
+        with self._lock:
+            number, day, offset = self._last_record()
+        first_day = date.fromordinal(day) if day else None
+        added = 0
+        for journal_day in journal.days():
+            if first_day and journal_day < first_day:
+                continue
+            start = offset if journal_day == first_day else 0
+            for record_offset, (_, invoice) in journal.located_records(journal_day, start):
+                if invoice.number is not None and invoice.number > number:
+                    self.add(invoice.number, journal_day, record_offset)
+                    number = invoice.number
+                    added += 1
+        if added:
+            logging.info(f"Indexed {added} invoice(s) missing from {self.path}")
+        return added
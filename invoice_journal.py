@@ -0,0 +1,179 @@
+"""Append-only journal of saved invoices, one JSON line per invoice in one file per day.
+
+Records hold what the operator typed; amounts are recomputed with the mode's
+calculator on read. A correction names the byte offset of the record it replaces.
+"""
+import json
+import logging
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from invoice_engine import MODES, Money, build_invoice
+
+JOURNAL_VERSION = 1
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+JournalRecord = namedtuple("JournalRecord", "when invoice")
+
+
+def encode_invoice(invoice, when, replaces=None):
+    """One journal line (without the newline) for an invoice saved at when.
+
+    replaces is the offset of the record this one corrects, in the same day's journal.
+    """
+    record = {
+        "v": JOURNAL_VERSION,
+        "at": when.strftime(TIMESTAMP_FORMAT),
+        "customer": invoice.customer,
+        "mode": invoice.mode,
+        "kata": int(invoice.kata_amount),
+        "lines": [[line.item, *line.texts] for line in invoice.lines],
+    }
+    if invoice.number is not None:
+        record["no"] = invoice.number
+    if replaces is not None:
+        record["re"] = replaces
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(record):
+    compiled = MODES[record["mode"]]
+    lines = [compiled.calculate(compiled.cells_of(item, texts)) for item, *texts in record["lines"]]
+    invoice = build_invoice(record["customer"], record["mode"], lines, Money(record.get("kata", 0)),
+                            record.get("no"))
+    return JournalRecord(datetime.strptime(record["at"], TIMESTAMP_FORMAT), invoice)
+
+
+def workbook_name(day):
+    return f"Invoice_{day:%Y-%m-%d}.xlsx"
+
+
+class InvoiceJournal:
+    """The per-day journal files in one directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()  # appends come from worker threads
+
+    def path_for(self, day):
+        return os.path.join(self.directory, f"Invoice_{day:%Y-%m-%d}.jsonl")
+
+    def append(self, invoice, when=None, replaces=None):
+        """Append an invoice to its day's journal; returns the journal path and the record's offset.
+
+        To correct a saved invoice, pass the time it was saved as when and its
+        record's offset as replaces.
+        """
+        when = when or datetime.now()
+        path = self.path_for(when.date())
+        record = (encode_invoice(invoice, when, replaces) + "\n").encode("utf-8")
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+        return path, offset
+
+    def records(self, day):
+        """The day's saved invoices in the order they were saved, each as last corrected."""
+        for _, record in self.current_records(day):
+            yield record
+
+    def current_records(self, day):
+        """(offset, record) of the day's saved invoices as last corrected, in the order they were saved."""
+        entries = list(self._entries(day))
+        corrected = {replaces: offset for offset, replaces, _ in entries if replaces is not None}
+        by_offset = {offset: record for offset, _, record in entries}
+        for offset, replaces, _ in entries:
+            if replaces is not None:
+                continue
+            while offset in corrected:
+                offset = corrected[offset]
+            yield offset, by_offset[offset]
+
+    def located_records(self, day, start=0):
+        """(offset, record) for every record of the day's journal from byte offset start on, corrections included."""
+        for offset, _, record in self._entries(day, start):
+            yield offset, record
+
+    def latest(self, day, offset):
+        """(offset, record) of the record at a byte offset of the day's journal, as last corrected."""
+        current = None
+        for entry_offset, replaces, record in self._entries(day, offset):
+            if current is None or replaces == current[0]:
+                current = (entry_offset, record)
+        if current is None:
+            raise ValueError(f"No record at {self.path_for(day)}@{offset}")
+        return current
+
+    def _entries(self, day, start=0):
+        """(offset, offset it corrects or None, record) for the day's records from byte offset start on."""
+        path = self.path_for(day)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            offset = f.seek(start)
+            for raw in f:
+                record_offset, offset = offset, offset + len(raw)
+                if not raw.endswith(b"\n"):
+                    logging.warning(f"{path}@{record_offset}: skipping incomplete last record")
+                    continue
+                try:
+                    record = json.loads(raw.decode("utf-8"))
+                    yield record_offset, record.get("re"), _decode(record)
+                except (ValueError, KeyError) as e:
+                    logging.error(f"{path}@{record_offset}: unreadable record: {e}")
+
+    def days(self):
+        """Dates that have a journal, oldest first."""
+        days = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith("Invoice_") and name.endswith(".jsonl"):
+                    try:
+                        days.append(datetime.strptime(name[8:-6], "%Y-%m-%d").date())
+                    except ValueError:
+                        continue
+        return sorted(days)
+
+    def import_workbook(self, workbook_path, day):
+        """Seed a day's journal from a workbook saved before the journal existed (once)."""
+        from openpyxl import load_workbook
+        from workbook_export import read_sheet_rows
+
+        if os.path.exists(self.path_for(day)) or not os.path.exists(workbook_path):
+            return 0
+        wb = load_workbook(workbook_path, read_only=True)
+        records = []
+        for mode in MODES:
+            if mode not in wb.sheetnames:
+                continue
+            current = None  # (timestamp, customer) of the invoice being collected
+            cells_rows = []
+            for timestamp, customer, cells in read_sheet_rows(wb, mode):
+                key = (timestamp, customer)
+                if key != current and cells_rows:
+                    records.append((current, mode, cells_rows))
+                    cells_rows = []
+                current = key
+                cells_rows.append(cells)
+            if cells_rows:
+                records.append((current, mode, cells_rows))
+        wb.close()
+
+        records.sort(key=lambda record: record[0][0])
+        for (timestamp, customer), mode, cells_rows in records:
+            calculate = MODES[mode].calculate
+            invoice = build_invoice(customer, mode, [calculate(cells) for cells in cells_rows])
+            try:
+                when = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+            except ValueError:
+                when = datetime.combine(day, datetime.min.time())
+            self.append(invoice, when)
+        logging.info(f"Imported {len(records)} invoice(s) from {workbook_path} into the journal")
+        return len(records)
+
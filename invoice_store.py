@@ -0,0 +1,195 @@
+"""SQLite index of every saved invoice line, for queries across days (WAL mode)."""
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from invoice_engine import MODES, Money, Weight
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY,
+    number INTEGER,                -- invoice number; NULL for invoices saved before numbering
+    saved_at TEXT NOT NULL,        -- YYYY-MM-DD HH:MM:SS
+    day TEXT NOT NULL,             -- YYYY-MM-DD
+    customer TEXT NOT NULL,        -- as typed
+    customer_key TEXT NOT NULL,    -- upper case, single spaces; what lookups match
+    mode TEXT NOT NULL,
+    kata_paise INTEGER NOT NULL,
+    total_paise INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lines (
+    invoice_id INTEGER NOT NULL REFERENCES invoices(id),
+    position INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    texts TEXT NOT NULL,           -- JSON list of the typed input texts
+    quantity_grams INTEGER NOT NULL,
+    rate_paise INTEGER NOT NULL,
+    hamali_paise INTEGER NOT NULL,
+    amount_paise INTEGER NOT NULL,
+    PRIMARY KEY (invoice_id, position)
+);
+CREATE INDEX IF NOT EXISTS invoices_day ON invoices (day);
+CREATE INDEX IF NOT EXISTS invoices_customer ON invoices (customer_key, day);
+CREATE INDEX IF NOT EXISTS invoices_mode ON invoices (mode, day);
+CREATE INDEX IF NOT EXISTS lines_item ON lines (item, invoice_id);
+"""
+
+Purchase = namedtuple("Purchase", "saved_at customer mode item quantity rate amount")
+
+
+def customer_key(customer):
+    return " ".join(customer.split()).upper()
+
+
+class InvoiceStore:
+    """Invoices and their lines in one SQLite database, opened on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()  # one connection shared by the save threads
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; the journal is the durable copy
+            conn.executescript(SCHEMA)
+            if "number" not in [column[1] for column in conn.execute("PRAGMA table_info(invoices)")]:
+                conn.execute("ALTER TABLE invoices ADD COLUMN number INTEGER")  # a store from before numbering
+            conn.execute("CREATE INDEX IF NOT EXISTS invoices_number ON invoices (number)")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def add(self, invoice, when):
+        """Index one saved invoice; returns its row id."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return self._insert(conn, invoice, when)
+
+    def _insert(self, conn, invoice, when):
+        compiled = MODES[invoice.mode]
+        cursor = conn.execute(
+            "INSERT INTO invoices (number, saved_at, day, customer, customer_key, mode, kata_paise, total_paise)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (invoice.number, when.strftime("%Y-%m-%d %H:%M:%S"), when.strftime("%Y-%m-%d"), invoice.customer,
+             customer_key(invoice.customer), invoice.mode, int(invoice.kata_amount), int(invoice.total)))
+        invoice_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO lines (invoice_id, position, item, texts, quantity_grams, rate_paise,"
+            " hamali_paise, amount_paise) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(invoice_id, position, line.item, json.dumps(line.texts, ensure_ascii=False),
+              int(getattr(line, compiled.billed_field)), int(line.rate), int(line.hamali), int(line.amount))
+             for position, line in enumerate(invoice.lines)])
+        return invoice_id
+
+    def replace(self, previous, invoice, when):
+        """Re-index a corrected invoice in place of previous, in one transaction; returns its row id."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if previous.number is not None:
+                    ids = conn.execute("SELECT id FROM invoices WHERE number = ?", (previous.number,)).fetchall()
+                else:
+                    # Saved before numbering: the one row with everything previous was saved with
+                    ids = conn.execute(
+                        "SELECT id FROM invoices WHERE number IS NULL AND saved_at = ? AND customer = ?"
+                        " AND mode = ? AND kata_paise = ? AND total_paise = ? ORDER BY id LIMIT 1",
+                        (when.strftime("%Y-%m-%d %H:%M:%S"), previous.customer, previous.mode,
+                         int(previous.kata_amount), int(previous.total))).fetchall()
+                conn.executemany("DELETE FROM lines WHERE invoice_id = ?", ids)
+                conn.executemany("DELETE FROM invoices WHERE id = ?", ids)
+                return self._insert(conn, invoice, when)
+
+    def purchases(self, item=None, customer=None, mode=None, since=None, until=None, limit=None):
+        """Saved lines matching every given filter, oldest first (since/until are dates, inclusive)."""
+        clauses, params = [], []
+        if item is not None:
+            clauses.append("lines.item = ?")
+            params.append(item)
+        if customer is not None:
+            clauses.append("invoices.customer_key = ?")
+            params.append(customer_key(customer))
+        if mode is not None:
+            clauses.append("invoices.mode = ?")
+            params.append(mode)
+        if since is not None:
+            clauses.append("invoices.day >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("invoices.day <= ?")
+            params.append(str(until))
+        sql = ("SELECT invoices.saved_at, invoices.customer, invoices.mode, lines.item, lines.quantity_grams,"
+               " lines.rate_paise, lines.amount_paise FROM lines JOIN invoices ON invoices.id = lines.invoice_id")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY invoices.saved_at, lines.position"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [Purchase(saved_at, customer, mode, item, Weight(quantity), Money(rate), Money(amount))
+                for saved_at, customer, mode, item, quantity, rate, amount in rows]
+
+    def rebuild(self, journal):
+        """Drop everything and re-index every invoice in the journal."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM lines")
+                conn.execute("DELETE FROM invoices")
+        count = 0
+        for day in journal.days():
+            for when, invoice in journal.records(day):
+                self.add(invoice, when)
+                count += 1
+        return count
+
+
+def main():
+    from invoice_journal import InvoiceJournal
+    from paths import STORE_PATH, JOURNAL_DIR
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Query or rebuild the saved-invoice index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query")
+    query.add_argument("--item")
+    query.add_argument("--customer")
+    query.add_argument("--mode", choices=list(MODES))
+    query.add_argument("--since", help="YYYY-MM-DD")
+    query.add_argument("--until", help="YYYY-MM-DD")
+    commands.add_parser("rebuild", help="re-index every invoice in the journal")
+    args = parser.parse_args()
+
+    store = InvoiceStore(STORE_PATH)
+    start = time.perf_counter()
+    try:
+        if args.command == "rebuild":
+            count = store.rebuild(InvoiceJournal(JOURNAL_DIR))
+            logging.info(f"Indexed {count} invoice(s) in {time.perf_counter() - start:.2f}s")
+            return
+        purchases = store.purchases(args.item and args.item.strip().upper(), args.customer, args.mode,
+                                    args.since, args.until)
+        elapsed = time.perf_counter() - start
+        for p in purchases:
+            print(f"{p.saved_at}  {p.customer:<20} {p.mode:<7} {p.item:<15} {p.quantity:>10.2f} "
+                  f"{p.rate:>10.2f} {p.amount:>12.2f}")
+        logging.info(f"{len(purchases)} line(s) in {elapsed * 1000:.1f}ms")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Virtualized invoice table: widgets only for the rows on screen, in pooled slots rebound as it scrolls."""
+from tkinter import ttk
+
+import customtkinter as ctk
+
+from invoice_engine import InvoiceModel, Money, MODES
+from theme import TABLE_HEADER_FONT, TABLE_CELL_FONT, BORDER_COLOR, TEXT_COLOR, ERROR_COLOR, COMPUTED_CELL_COLOR
+
+ADD_ITEM_CHOICE = "Add New Item..."  # Last entry of every item dropdown
+ROW_HEIGHT = 44  # 38px cells plus 3px padding above and below
+
+
+class RowSlot:
+    """One on-screen row of widgets, bound to whichever model row is scrolled into it."""
+
+    def __init__(self, table, compiled_mode):
+        self.table = table
+        self.row_id = None
+        self.grid_row = None
+        self.visible = False
+        self.vars = {}      # column -> StringVar of an editable cell
+        self.labels = {}    # column -> CTkLabel of a computed cell (the amount is column cell_count)
+        self.shown = {}     # column -> text last put on screen
+        self.widgets = []
+        frame = table.grid_frame
+        cell_count = compiled_mode.cell_count
+
+        # Item dropdown with type-ahead; its values are fetched from the catalog when it opens
+        item_var = ctk.StringVar()
+        item_dropdown = ttk.Combobox(
+            frame,
+            font=TABLE_CELL_FONT,
+            textvariable=item_var,
+            postcommand=lambda: item_dropdown.configure(values=table.item_choices(item_var.get()))
+        )
+        item_dropdown.bind("<<ComboboxSelected>>", lambda e: table.on_item_selected(table, e, item_dropdown, self.row_id))
+        item_dropdown.bind("<Return>", lambda e: table.complete_item(item_var))
+        item_dropdown.bind("<FocusOut>", lambda e: table.complete_item(item_var))
+        self.item_dropdown = item_dropdown
+        self.widgets.append(item_dropdown)
+        self.vars[0] = item_var
+
+        # Entry fields with numeric validation; computed columns are display-only
+        for col in range(1, cell_count):
+            if col == compiled_mode.computed_column:
+                label = ctk.CTkLabel(
+                    frame,
+                    text="",
+                    font=TABLE_CELL_FONT,
+                    height=38,
+                    corner_radius=8,
+                    fg_color=COMPUTED_CELL_COLOR,
+                    text_color=TEXT_COLOR
+                )
+                self.widgets.append(label)
+                self.labels[col] = label
+                continue
+            var = ctk.StringVar()
+            entry = ctk.CTkEntry(
+                frame,
+                font=TABLE_CELL_FONT,
+                justify="center",
+                height=38,
+                corner_radius=8,
+                border_color=BORDER_COLOR,
+                fg_color="#ffffff",
+                textvariable=var,
+                validate='key',
+                validatecommand=table.validatecommand
+            )
+            entry.bind("<FocusIn>", table.select_all_on_focus)
+            self.widgets.append(entry)
+            self.vars[col] = var
+
+        amount_label = ctk.CTkLabel(
+            frame,
+            text="₹0.00",
+            font=TABLE_CELL_FONT,
+            anchor="e",
+            height=38,
+            corner_radius=8,
+            fg_color="#ffffff",
+            text_color=TEXT_COLOR
+        )
+        self.widgets.append(amount_label)
+        self.labels[cell_count] = amount_label
+        self.amount_column = cell_count
+
+        delete_btn = ctk.CTkButton(
+            frame,
+            text="X",
+            width=40,
+            height=38,
+            fg_color=ERROR_COLOR,
+            hover_color="#d32f2f",
+            corner_radius=8,
+            command=self._delete
+        )
+        self.widgets.append(delete_btn)
+
+        # Edits go to whichever row the slot currently shows
+        for col, var in self.vars.items():
+            var.trace_add("write", lambda *args, c=col, v=var: table._on_slot_edit(self, c, v.get()))
+        for widget in self.widgets:
+            widget.bind("<MouseWheel>", table._on_mousewheel)
+
+    def _delete(self):
+        if self.row_id is not None:
+            self.table.on_delete_row(self.table, self.row_id)
+
+    def paint(self, column, text):
+        """Put text in a cell, touching Tk only if it differs from what is already shown."""
+        if self.shown.get(column) == text:
+            return
+        self.shown[column] = text
+        if column in self.labels:
+            self.labels[column].configure(text=text)
+        else:
+            self.vars[column].set(text)
+
+    def typed(self, column, text):
+        """Record text the user typed (it is already on screen)."""
+        self.shown[column] = text
+
+    def place_at(self, grid_row):
+        if grid_row != self.grid_row:
+            self.grid_row = grid_row
+            self.visible = False  # Re-grid at the new row on the next show()
+
+    def show(self):
+        if not self.visible:
+            last = len(self.widgets) - 1
+            for col, widget in enumerate(self.widgets):
+                widget.grid(row=self.grid_row, column=col, padx=3, pady=3, sticky="" if col == last else "nsew")
+            self.visible = True
+
+    def hide(self):
+        if self.visible:
+            for widget in self.widgets:
+                widget.grid_remove()
+            self.visible = False
+        self.row_id = None
+
+
+class SlotPool:
+    """Pre-built row slots for one mode; released slots wait, hidden, to be reused."""
+
+    def __init__(self, table, mode):
+        self.table = table
+        self.compiled_mode = MODES[mode]
+        self._free = []
+
+    def __len__(self):
+        return len(self._free)
+
+    def acquire(self, grid_row):
+        slot = self._free.pop() if self._free else RowSlot(self.table, self.compiled_mode)
+        slot.place_at(grid_row)
+        return slot
+
+    def release(self, slot):
+        slot.hide()
+        self._free.append(slot)
+
+    def prebuild(self, count):
+        """Build spare slots in the background, one per idle tick, until count are free."""
+        if len(self._free) < count:
+            self._free.append(RowSlot(self.table, self.compiled_mode))
+            self.table.after_idle(self.prebuild, count)
+
+
+class InvoiceTable(ctk.CTkFrame):
+    """Header plus a fixed number of row slots over an InvoiceModel.
+
+    The callbacks get the table as their first argument: row ids are only
+    unique within one table, and an edit may land after another mode is shown.
+    """
+
+    def __init__(self, master, mode, catalog, on_cell_changed, on_item_selected, on_delete_row,
+                 validatecommand, select_all_on_focus, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = InvoiceModel(mode)
+        self.catalog = catalog
+        self.on_cell_changed = on_cell_changed
+        self.on_item_selected = on_item_selected
+        self.on_delete_row = on_delete_row
+        self.validatecommand = validatecommand
+        self.select_all_on_focus = select_all_on_focus
+
+        self._slots = []
+        self._pool = SlotPool(self, mode)
+        self._slot_by_row = {}    # row_id -> slot currently showing it
+        self._top = 0             # position of the first visible row
+        self._binding = False     # True while slots are being refilled (ignore their traces)
+
+        self.grid_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.grid_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        # The slots follow the frame's size, not the other way round
+        self.grid_frame.grid_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(
+            self,
+            command=self._on_scrollbar,
+            button_color="#4a4a4a",  # Dark grey
+            button_hover_color="#666666"  # Slightly lighter grey for hover
+        )
+        self.scrollbar.pack(side="right", fill="y", pady=5)
+
+        self._create_headers()
+        self.grid_frame.bind("<Configure>", self._on_resize)
+        self.grid_frame.bind("<MouseWheel>", self._on_mousewheel)
+        self._slots = [self._pool.acquire(1)]
+
+    def _create_headers(self):
+        headers = self.model.compiled_mode.headers
+        for i, h in enumerate(headers):
+            header_label = ctk.CTkLabel(
+                self.grid_frame,
+                text=h,
+                font=TABLE_HEADER_FONT,
+                text_color="white",
+                fg_color="#547792",  # Same as mode selection color
+                corner_radius=8,
+                height=38,
+                anchor="center"
+            )
+            header_label.grid(row=0, column=i, sticky="nsew", padx=3, pady=3)
+            self.grid_frame.grid_columnconfigure(i, weight=1)
+        # Add empty space for delete column (no header)
+        self.grid_frame.grid_columnconfigure(len(headers), weight=0)
+
+    @property
+    def slot_count(self):
+        """How many rows fit on screen."""
+        return len(self._slots)
+
+    def prebuild(self, count):
+        """Have count slots ready before this table is first shown."""
+        self._pool.prebuild(count - len(self._slots))
+
+    # --- Rows ---------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.model)
+
+    def row_ids(self):
+        return self.model.row_ids()
+
+    def add_row(self, cells=None):
+        """Append a row to the model and scroll it into view."""
+        row_id = self.model.add_row(cells)
+        position = len(self.model) - 1
+        if position < self._top + len(self._slots):
+            # Lands in a free slot on screen: fill just that one
+            self._bind_slot(self._slots[position - self._top], row_id)
+            self._update_scrollbar()
+        else:
+            self.scroll_to(len(self.model) - len(self._slots))
+        return row_id
+
+    def delete_row(self, row_id):
+        """Remove a row; only the slots at and below it on screen are rebound."""
+        position = self.model.order.position(row_id)
+        self.model.remove_row(row_id)
+        slot = self._slot_by_row.pop(row_id, None)
+        if position < self._top:
+            # The same rows stay on screen, one position higher
+            self._top -= 1
+        elif slot is not None:
+            top = max(0, min(self._top, len(self.model) - len(self._slots)))
+            if top != self._top:
+                # Near the end: pull the rows above down instead of leaving a gap
+                self.scroll_to(top, force=True)
+                return
+            self._fill(self._slots.index(slot))
+        self._update_scrollbar()
+
+    def clear(self):
+        """Drop every row and leave a single blank one."""
+        self.model.clear()
+        self.model.add_row()
+        self.scroll_to(0, force=True)
+
+    def restore(self, rows):
+        """Replace the rows with (row_id, cells) pairs; a row_id of None gets a new id."""
+        self.model.clear()
+        for row_id, cells in rows:
+            self.model.add_row(cells, row_id=row_id)
+        if not len(self.model):
+            self.model.add_row()
+        self.scroll_to(0, force=True)
+
+    def fill_cells(self, row_id, cells):
+        """Set cells of a row from code (column -> text); True if any changed."""
+        changed = False
+        slot = self._slot_by_row.get(row_id)
+        self._binding = True
+        try:
+            for column, text in cells.items():
+                if self.model.set_text(row_id, column, text):
+                    changed = True
+                    if slot is not None:
+                        slot.paint(column, text)
+        finally:
+            self._binding = False
+        return changed
+
+    def item_choices(self, text):
+        """Dropdown values for an item cell: matches for what is typed, or every item."""
+        if text.strip() and text not in self.catalog:
+            names = self.catalog.search(text)
+        else:
+            names = self.catalog.names
+        return names + [ADD_ITEM_CHOICE]
+
+    def complete_item(self, item_var):
+        """Complete a partly typed item if exactly one catalog name starts with it.
+
+        Close spellings are only offered in the dropdown: an unknown item such
+        as "RICE BRAN" is kept as typed rather than turned into "RICE".
+        """
+        text = item_var.get()
+        if text.strip() and text not in self.catalog:
+            name = self.catalog.complete(text)
+            if name is not None:
+                item_var.set(name)
+
+    # --- Painting -----------------------------------------------------------
+
+    def paint_row(self, row_id, line):
+        """Show a row's amount and computed column, if the row is on screen."""
+        slot = self._slot_by_row.get(row_id)
+        if slot is None:
+            return
+        computed_column = self.model.compiled_mode.computed_column
+        if computed_column is not None:
+            slot.paint(computed_column, f"{line.computed:.2f}")
+        slot.paint(slot.amount_column, f"₹{Money(line.amount):.2f}")
+
+    def paint_error(self, row_id):
+        slot = self._slot_by_row.get(row_id)
+        if slot is not None:
+            slot.paint(slot.amount_column, "₹Error")  # Indicate error on the row
+
+    def repaint(self):
+        """Refill every slot from the model."""
+        self.scroll_to(self._top, force=True)
+
+    def _bind_slot(self, slot, row_id):
+        slot.row_id = row_id
+        self._slot_by_row[row_id] = slot
+        self._binding = True
+        try:
+            for column, text in enumerate(self.model.cells(row_id)):
+                if column in slot.vars:
+                    slot.paint(column, text)
+        finally:
+            self._binding = False
+        self.paint_row(row_id, self.model.line(row_id))
+        slot.show()
+
+    def _on_slot_edit(self, slot, column, text):
+        if self._binding or slot.row_id is None:
+            return
+        slot.typed(column, text)
+        self.on_cell_changed(self, slot.row_id, column, text)
+
+    # --- Scrolling ----------------------------------------------------------
+
+    def scroll_to(self, top, force=False):
+        """Show rows from position top onwards."""
+        top = max(0, min(top, len(self.model) - len(self._slots)))
+        if top == self._top and not force:
+            return
+        self._top = top
+        self._fill(0)
+        self._update_scrollbar()
+
+    def _fill(self, first):
+        """Rebind the slots from index first onwards to the rows now in their positions."""
+        slots = self._slots[first:]
+        for slot in slots:
+            self._slot_by_row.pop(slot.row_id, None)
+        rows = self.model.order.window(self._top + first, len(slots))
+        for slot, row_id in zip(slots, rows):
+            self._bind_slot(slot, row_id)
+        for slot in slots[len(rows):]:
+            slot.hide()
+
+    def _update_scrollbar(self):
+        count = len(self.model)
+        if count <= len(self._slots):
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._top / count, (self._top + len(self._slots)) / count)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.model)))
+        elif action == "scroll":
+            step = len(self._slots) if unit == "pages" else 1
+            self.scroll_to(self._top + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_to(self._top - int(event.delta / 120))
+
+    def _on_resize(self, event):
+        """Keep exactly as many slots as fit below the header."""
+        wanted = max(1, event.height // ROW_HEIGHT - 1)
+        if wanted == len(self._slots):
+            return
+        while len(self._slots) > wanted:
+            slot = self._slots.pop()
+            # Its row is no longer on screen: delete_row and painting must not find the pooled slot
+            self._slot_by_row.pop(slot.row_id, None)
+            self._pool.release(slot)
+        while len(self._slots) < wanted:
+            self._slots.append(self._pool.acquire(len(self._slots) + 1))
+        self.scroll_to(self._top, force=True)
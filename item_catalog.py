@@ -0,0 +1,148 @@
+"""Item names for the invoice table's item field.
+
+The catalog is persisted as a plain text file, one name per line. Adding
+an item appends one line instead of rewriting the file. Every row's
+dropdown asks the catalog for its values when it opens, so adding an item
+never has to touch the rows.
+
+Lookups go through three indexes built at load time:
+- a sorted list of names, for prefix matches ("TO" -> "TOOR RED")
+- a sorted list of (word, name) pairs, for word prefixes ("RED" -> "TOOR RED")
+- trigram sets, for typos ("TOR RED" -> "TOOR RED")
+"""
+import logging
+import os
+from bisect import bisect_left, insort
+
+MAX_RESULTS = 30
+
+
+def normalize(name):
+    """Catalog form of an item name: upper case, single spaces."""
+    return " ".join(name.split()).upper()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _prefix_range(sorted_keys, prefix):
+    """Slice bounds of the keys in sorted_keys that start with prefix."""
+    start = bisect_left(sorted_keys, prefix)
+    end = bisect_left(sorted_keys, prefix + "\uffff", start)
+    return start, end
+
+
+class ItemCatalog:
+    """Known item names in the order they were added, with type-ahead search."""
+
+    def __init__(self, path, defaults=()):
+        self.path = path
+        self.names = []         # display order
+        self._sorted = []       # names, sorted
+        self._words = []        # (word, name), sorted
+        self._word_keys = []    # the words alone, for bisect
+        self._trigrams = {}     # trigram -> set of names
+        names = self._read() or list(defaults)
+        for name in names:
+            self._index(normalize(name))
+        if not os.path.exists(path):
+            self._write_all()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        name = normalize(name)
+        i = bisect_left(self._sorted, name)
+        return i < len(self._sorted) and self._sorted[i] == name
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logging.error(f"Error loading item catalog {self.path}: {e}")
+            return []
+
+    def _write_all(self):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.writelines(f"{name}\n" for name in self.names)
+        except Exception as e:
+            logging.error(f"Error saving item catalog {self.path}: {e}")
+
+    def _index(self, name):
+        if not name or name in self:
+            return False
+        self.names.append(name)
+        insort(self._sorted, name)
+        for word in set(name.split()):
+            i = bisect_left(self._words, (word, name))
+            self._words.insert(i, (word, name))
+            self._word_keys.insert(i, word)
+        for trigram in _trigrams(name):
+            self._trigrams.setdefault(trigram, set()).add(name)
+        return True
+
+    def add(self, name):
+        """Add and persist a new item; returns its catalog name, or None if it is blank or known."""
+        name = normalize(name)
+        if not self._index(name):
+            return None
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{name}\n")
+        except Exception as e:
+            logging.error(f"Error saving item {name} to {self.path}: {e}")
+        return name
+
+    def complete(self, text):
+        """The one name that starts with the typed text, or None if no name or several do."""
+        query = normalize(text)
+        if not query:
+            return None
+        start, end = _prefix_range(self._sorted, query)
+        return self._sorted[start] if end - start == 1 else None
+
+    def search(self, text, limit=MAX_RESULTS):
+        """Names matching typed text: prefixes first, then word prefixes, then close spellings."""
+        query = normalize(text)
+        if not query:
+            return self.names[:limit]
+        results = []
+        seen = set()
+
+        def take(names):
+            for name in names:
+                if name not in seen:
+                    seen.add(name)
+                    results.append(name)
+                    if len(results) == limit:
+                        return True
+            return False
+
+        start, end = _prefix_range(self._sorted, query)
+        if take(self._sorted[start:min(end, start + limit)]):
+            return results
+        start, end = _prefix_range(self._word_keys, query)
+        if take(name for _, name in self._words[start:min(end, start + limit * 2)]):
+            return results
+
+        # Close spellings: names sharing most of the query's trigrams
+        query_trigrams = _trigrams(query)
+        counts = {}
+        for trigram in query_trigrams:
+            for name in self._trigrams.get(trigram, ()):
+                counts[name] = counts.get(name, 0) + 1
+        needed = max(2, len(query_trigrams) // 2)
+        close = sorted((name for name, count in counts.items() if count >= needed),
+                       key=lambda name: (-counts[name], len(name), name))
+        take(close)
+        return results
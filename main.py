@@ -1,15 +1,32 @@
+import time
+STARTED_AT = time.perf_counter()  # Before the other imports, so startup timing includes them
+
 import customtkinter as ctk
 from tkinter import messagebox, ttk, Toplevel, Text, Scrollbar
 from datetime import datetime
 import os
 import logging
-from openpyxl import Workbook, load_workbook
 import json
-import win32print
-import win32api
-from win32printing import Printer
 import codecs
-import threading
+from dataclasses import replace
+from invoice_engine import Money, render_receipt, MODES
+from invoice_table import InvoiceTable, ADD_ITEM_CHOICE
+from draft_log import DraftLog, model_records
+from item_catalog import ItemCatalog
+from rate_cache import RateCache
+from invoice_index import InvoiceIndex
+from invoice_journal import InvoiceJournal, workbook_name
+from invoice_store import InvoiceStore
+from paths import INDEX_PATH, INVOICE_SAVE_DIR, JOURNAL_DIR, RECEIPTS_DIR, SAVED_HASHES_PATH, STORE_PATH
+from persistence import PersistenceWorker
+from receipt_archive import ReceiptArchive
+from saved_hashes import SavedHashes
+from scheduler import FrameScheduler
+from workbook_export import journal_records, month_name, write_workbook
+from theme import (
+    HEADER_FONT, SUBHEADER_FONT, LABEL_FONT, ENTRY_FONT, BUTTON_FONT,
+    BACKGROUND_COLOR, FRAME_COLOR, BORDER_COLOR, TEXT_COLOR
+)
 
 # Configure logging
 logging.basicConfig(
@@ -19,64 +36,46 @@ logging.basicConfig(
 
 # Constants
 CONFIG_FILE = "app_config.json"
-INVOICE_SAVE_DIR = r"D:\invoices"  # Default directory for saving invoices
 AUTOSAVE_INTERVAL = 300000  # 5 minutes in milliseconds
 
-# Item list for dropdown
-ITEM_LIST = [
-    "MAIZE", "SOYABEAN", "LOBHA", "HULLI", "KADLI", "BLACK MOONG", 
-    "CHAMAKI MOONG", "RAGI", "WHEAT", "RICE", "BILAJOLA", "BIJAPUR", 
-    "CHS-5", "FEEDS", "KUSUBI", "SASAVI", "SAVI", "CASTER SEEDS", 
+ITEM_CATALOG_FILE = "item_catalog.txt"
+RATE_CACHE_FILE = "rate_cache.jsonl"
+DRAFT_LOG_FILE = "draft_log.jsonl"
+INVOICE_NUMBER_FILE = "invoice_number.txt"  # last invoice number given out, even if the invoice drive is missing
+DRAFT_SYNC_MS = 1000  # edits reach the disk at most this long after they are typed
+
+# Items the catalog starts with on first run; later additions are saved to ITEM_CATALOG_FILE
+DEFAULT_ITEMS = [
+    "MAIZE", "SOYABEAN", "LOBHA", "HULLI", "KADLI", "BLACK MOONG",
+    "CHAMAKI MOONG", "RAGI", "WHEAT", "RICE", "BILAJOLA", "BIJAPUR",
+    "CHS-5", "FEEDS", "KUSUBI", "SASAVI", "SAVI", "CASTER SEEDS",
     "TOOR RED", "TOOR WHITE", "HUNASIBIKA", "SF", "AWARI",
-    "Add New Item..."  # Add this as the last option
 ]
 
-def validate_float(value):
-    """Validate if a string can be converted to float."""
-    try:
-        return float(value) if value.strip() else 0
-    except ValueError:
-        return 0
-
-# Define font configurations
-HEADER_FONT = ("Segoe UI", 28, "bold")
-SUBHEADER_FONT = ("Segoe UI", 16)
-LABEL_FONT = ("Segoe UI", 13)
-ENTRY_FONT = ("Segoe UI", 13)
-TABLE_HEADER_FONT = ("Segoe UI", 13, "bold")
-TABLE_FONT = ("Segoe UI", 13)
-BUTTON_FONT = ("Segoe UI", 13)
-
-# Define color scheme for light theme
-PRIMARY_COLOR = "#1976d2"      # Blue
-SECONDARY_COLOR = "#2196f3"    # Lighter blue
-ACCENT_COLOR = "#64b5f6"       # Even lighter blue
-BACKGROUND_COLOR = "#ffffff"    # White
-FRAME_COLOR = "#f5f5f5"        # Light gray
-BORDER_COLOR = "#e0e0e0"       # Border gray
-TEXT_COLOR = "#212121"         # Dark gray for text
-ERROR_COLOR = "#f44336"        # Red
-
 class InvoiceApp(ctk.CTk):
     def __init__(self):
         super().__init__()
-        # Initialize mode-specific data storage first with empty data structures
-        self.mode_data = {
-            "Patti": [],
-            "Kata": [],
-            "Barthe": []
-        }
-        
-        # Track whether data has been entered in each mode
-        self.mode_initialized = {
-            "Patti": False,
-            "Kata": False, 
-            "Barthe": False
-        }
-        
         self.load_config()
+        self.catalog = ItemCatalog(ITEM_CATALOG_FILE, DEFAULT_ITEMS)
+        self.rate_cache = RateCache(RATE_CACHE_FILE)
+        self.journal = InvoiceJournal(JOURNAL_DIR)
+        self.store = InvoiceStore(STORE_PATH)
+        self.index = InvoiceIndex(INDEX_PATH, INVOICE_NUMBER_FILE)  # invoice numbers and where each invoice is saved
+        self.saved_hashes = SavedHashes(SAVED_HASHES_PATH)  # what each draft was saved as, to skip saving it again
+        self.session = f"{datetime.now():%Y%m%d%H%M%S}.{os.getpid()}"  # makes draft ids unique across runs
+        self._draft_ids = {}  # mode -> (model.draft, draft id) of the draft its table holds
+        self.receipts = ReceiptArchive(RECEIPTS_DIR)  # every receipt printed, for reprints
+        self._last_saved = None  # the last invoice saved, with its number (persistence worker only)
+        self.persistence = PersistenceWorker()  # saves, exports, prints and draft log syncs, one at a time
+        self.draft_log = DraftLog(DRAFT_LOG_FILE)  # crash recovery for what is on screen
+        self._recovery = self.replay_draft_log()  # before any table exists to log into the last session's file
+        self._draft_log_started = False  # nothing is synced until the log is restarted from the screen
+        self._draft_sync = None  # after() id while a draft log sync is scheduled
+        self._receipt = None  # ((content hash, number, minute), lines) of the last receipt rendered
+        self._exported = {}  # day -> journal size when its workbook was last written
+        self._synced_state = None  # customer and model versions as of the last draft log sync
+        self.skipped = {"autosave": 0, "redraw": 0, "receipt": 0, "export": 0, "save": 0}  # work avoided because nothing changed
         self.setup_ui()
-        self._update_timer = None  # Add this line for debouncing
 
     def load_config(self):
         """Load application configuration from file"""
@@ -113,8 +112,11 @@ class InvoiceApp(ctk.CTk):
         # Maximize the window after all widgets are initialized
         self.after(100, lambda: self.state('zoomed'))
 
-        self.current_mode = ctk.StringVar(value="Patti")
-        self.rows = []
+        self.current_mode = ctk.StringVar(value=next(iter(MODES)))
+        self.tables = {}  # mode -> its live InvoiceTable; each keeps its own rows
+        self.scheduler = FrameScheduler(self, self.paint_total)
+        self.table = None
+        self.model = None
         self.row_counter = 0
         self.autosave_var = ctk.BooleanVar(value=self.config["autosave"])
 
@@ -132,9 +134,26 @@ class InvoiceApp(ctk.CTk):
         self.kata_amount_entry = None
 
         self.numeric_vcmd = (self.register(self.only_numeric_input), '%P')
-        self.check_autosave_on_start()
         self.build_ui()
-        self.schedule_auto_save()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.scheduler.poll_inbox()
+        # Everything else waits until the window is on screen
+        self.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        """Report startup timing, then start the work that need not delay the first frame."""
+        self.update_idletasks()
+        logging.info(f"Startup: first paint after {(time.perf_counter() - STARTED_AT) * 1000:.0f}ms")
+        self.rate_cache.load_async(INVOICE_SAVE_DIR, self.persistence.submit)
+        # Index anything saved after the index was last written, before the first number is given out
+        self.persistence.submit("invoice index", self.index.catch_up, self.journal)
+        # Close any day the app was not open to close (e.g. closed from the task manager)
+        self.persistence.submit("export stale days", self.export_stale_days)
+        self.after_idle(self.on_interactive)
+
+    def on_interactive(self):
+        logging.info(f"Startup: interactive after {(time.perf_counter() - STARTED_AT) * 1000:.0f}ms")
+        self.check_autosave_on_start()
 
     def build_ui(self):
         # Main container frame with rounded corners and padding
@@ -181,7 +200,7 @@ class InvoiceApp(ctk.CTk):
         nav_frame.pack(pady=20)
         
         self.mode_buttons = {}
-        for i, mode in enumerate(["Patti", "Kata", "Barthe"]):
+        for i, mode in enumerate(MODES):
             btn = ctk.CTkButton(
                 nav_frame,
                 text=mode,
@@ -209,8 +228,10 @@ class InvoiceApp(ctk.CTk):
             text_color=TEXT_COLOR
         ).pack(side="left", padx=(0, 10))
         
+        self.customer_var = ctk.StringVar()
         self.customer_entry = ctk.CTkEntry(
             customer_frame,
+            textvariable=self.customer_var,
             width=400,
             font=ENTRY_FONT,
             height=38,
@@ -219,25 +240,11 @@ class InvoiceApp(ctk.CTk):
             fg_color="#ffffff"
         )
         self.customer_entry.pack(side="left")
+        self.customer_var.trace_add("write", lambda *args: self.log_draft("cust", self.customer_var.get()))
 
-        # Create a container for the table with scrolling
-        table_container = ctk.CTkFrame(main_frame, fg_color="transparent")
-        table_container.pack(fill="both", expand=True, padx=20, pady=(20, 10))
-
-        # Create a scrollable frame with automatic scrollbar
-        self.scrollable_frame = ctk.CTkScrollableFrame(
-            table_container,
-            fg_color=FRAME_COLOR,
-            corner_radius=10,
-            border_width=1,
-            border_color=BORDER_COLOR,
-            scrollbar_button_color="#4a4a4a",  # Dark grey
-            scrollbar_button_hover_color="#666666"  # Slightly lighter grey for hover
-        )
-        self.scrollable_frame.pack(fill="both", expand=True)
-
-        # Set the table frame to the scrollable frame
-        self.table_frame = self.scrollable_frame
+        # Create a container for the table; the table itself is built per mode
+        self.table_container = ctk.CTkFrame(main_frame, fg_color="transparent")
+        self.table_container.pack(fill="both", expand=True, padx=20, pady=(20, 10))
 
         # Bottom frame with improved styling
         self.bottom_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
@@ -276,7 +283,14 @@ class InvoiceApp(ctk.CTk):
         ctk.CTkButton(
             left_buttons_frame,
             text="Save",
-            command=self.save_to_excel_async,
+            command=self.save_invoice_async,
+            **button_style
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            left_buttons_frame,
+            text="Export Excel",
+            command=self.export_day_workbook_async,
             **button_style
         ).pack(side="left", padx=5)
 
@@ -287,6 +301,13 @@ class InvoiceApp(ctk.CTk):
             **button_style
         ).pack(side="left", padx=5)
 
+        ctk.CTkButton(
+            left_buttons_frame,
+            text="Reopen",
+            command=self.reopen_invoice,
+            **button_style
+        ).pack(side="left", padx=5)
+
         ctk.CTkButton(
             left_buttons_frame,
             text="Print",
@@ -294,12 +315,19 @@ class InvoiceApp(ctk.CTk):
             **button_style
         ).pack(side="left", padx=5)
 
+        ctk.CTkButton(
+            left_buttons_frame,
+            text="Reprint",
+            command=self.reprint_async,
+            **button_style
+        ).pack(side="left", padx=5)
+
         # Total section with improved styling
         right_total_frame = ctk.CTkFrame(self.bottom_frame, fg_color="transparent")
         right_total_frame.pack(side="right")
 
+        # Packed by switch_mode while a Kata-deduction mode is shown
         self.kata_field_frame = ctk.CTkFrame(right_total_frame, fg_color="transparent")
-        self.kata_field_frame.pack(side="left", padx=(0, 15))
 
         self.total_label = ctk.CTkLabel(
             right_total_frame,
@@ -310,264 +338,126 @@ class InvoiceApp(ctk.CTk):
         self.total_label.pack(side="left")
 
         # Create initial table content
-        self.create_table_headers()
-        self.add_row()
         self.switch_mode()
 
-        # Bind the canvas to update its width when the window is resized
-        self.bind("<Configure>", self.on_window_resize)
-
-    def _on_mousewheel(self, event):
-        """Handle mouse wheel scrolling."""
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-    def on_window_resize(self, event):
-        """Update the canvas width when the window is resized."""
-        if hasattr(self, 'canvas') and hasattr(self, 'table_frame'):
-            # Update the canvas window width
-            self.canvas.itemconfig(self.canvas.find_withtag("all")[0], width=event.width - 100)
-            # Update the table frame width
-            self.table_frame.configure(width=event.width - 100)
-
-    def create_table_headers(self):
-        # Remove existing widgets
-        for widget in self.table_frame.winfo_children():
-            widget.destroy()
-
-        headers = []
-        mode = self.current_mode.get()
-        if mode == "Patti":
-            headers = ["Item", "Packet", "Quantity", "+", "Rate", "Hamali", "Amount"]
-        elif mode == "Kata":
-            headers = ["Item", "Net Wt", "Less%", "Final Wt", "Rate", "Hamali Rate", "Amount"]
-        elif mode == "Barthe":
-            headers = ["Item", "Packet", "Weight", "+", "Total Qty", "Rate", "Hamali", "Amount"]
-
-        self._current_headers = headers
-
-        # Create headers with improved styling
-        for i, h in enumerate(headers):
-            header_label = ctk.CTkLabel(
-                self.table_frame,
-                text=h,
-                font=TABLE_HEADER_FONT,
-                text_color="white",
-                fg_color="#547792",  # Same as mode selection color
-                corner_radius=8,
-                height=38,
-                anchor="center"
-            )
-            header_label.grid(row=0, column=i, sticky="nsew", padx=3, pady=3)
-            self.table_frame.grid_columnconfigure(i, weight=1)
-
-        # Add empty space for delete column (no header)
-        self.table_frame.grid_columnconfigure(len(headers), weight=0)
-
-    def switch_mode(self, previous_mode=None):
-        """Switch between Patti, Kata, and Barthe modes with complete data isolation."""
-        # 1. First capture and save the current mode data
-        current_mode = previous_mode if previous_mode else self.current_mode.get()
-        logging.info(f"Switching FROM {current_mode} mode")
-        
-        # Collect all data from current UI rows
-        current_data = []
-        for row_data in self.rows:
-            # Skip empty rows
-            if not row_data["widgets"] or not hasattr(row_data["widgets"][0], "get"):
-                continue
-                
-            # Get the item name
-            item_name = row_data["widgets"][0].get()
-            if not item_name.strip():
-                continue  # Skip rows with empty item names
-                
-            # Collect all values from this row
-            row_values = []
-            for widget in row_data["widgets"]:
-                if isinstance(widget, (ctk.CTkEntry, ttk.Combobox)):
-                    row_values.append(widget.get())
-                elif isinstance(widget, ctk.CTkLabel) and "₹" in str(widget.cget("text")):
-                    # Extract the amount value (remove ₹ and Error)
-                    text = widget.cget("text").replace('₹', '').replace('Error', '0').strip()
-                    row_values.append(text)
-                else:
-                    # Skip delete buttons and other non-data widgets
-                    continue
-            
-            # Only add rows with valid data
-            if len(row_values) >= 2:  # At least item name + one other field
-                current_data.append(row_values)
-        
-        # Save current mode data if there's any content
-        if current_data:
-            self.mode_data[current_mode] = current_data
-            self.mode_initialized[current_mode] = True
-            logging.info(f"Saved {len(current_data)} rows for {current_mode} mode")
-        elif self.mode_initialized[current_mode]:
-            # Preserve empty data only if this mode was previously initialized with data
-            self.mode_data[current_mode] = []
-            logging.info(f"Saved empty data for {current_mode} mode (was previously initialized)")
-        
-        # 2. Clear current UI completely
-        
-        # Clear Kata amount field if it exists
-        for widget in self.kata_field_frame.winfo_children():
-            widget.destroy()
-        self.kata_amount_entry = None
-        
-        # Clear all table rows
-        for row_data in self.rows:
-            for widget in row_data["widgets"]:
-                widget.destroy()
+    def create_table(self, mode):
+        """Create a mode's table with one blank row; it stays alive, hidden, while other modes are shown."""
+        table = InvoiceTable(
+            self.table_container,
+            mode,
+            catalog=self.catalog,
+            on_cell_changed=self.on_cell_changed,
+            on_item_selected=self.handle_item_selection,
+            on_delete_row=self.delete_row,
+            validatecommand=self.numeric_vcmd,
+            select_all_on_focus=self.select_all_on_focus,
+            fg_color=FRAME_COLOR,
+            corner_radius=10,
+            border_width=1,
+            border_color=BORDER_COLOR
+        )
+        table.model.listener = self.log_draft
+        table.add_row()
+        self.tables[mode] = table
+        return table
+
+    def prebuild_tables(self):
+        """Build the other modes' tables on idle ticks so the first switch to them is instant too."""
+        for mode in MODES:
+            if mode not in self.tables:
+                self.create_table(mode).prebuild(self.table.slot_count)
+                self.after_idle(self.prebuild_tables)
+                return
 
-        # Recreate table headers for the new mode
-        self.create_table_headers()
-        
-        # Reset the rows list
-        self.rows = []
-        
-        # 3. Load data for the new mode
+    def switch_mode(self):
+        """Show the current mode's table; every mode keeps its rows, model and scroll position."""
         new_mode = self.current_mode.get()
         logging.info(f"Switching TO {new_mode} mode")
-        
-        # Get the saved data for this mode
-        mode_specific_data = self.mode_data.get(new_mode, [])
-        
-        # Only add the data if this mode was previously initialized or has data
-        if mode_specific_data and self.mode_initialized.get(new_mode, False):
-            for row_values in mode_specific_data:
-                # Skip invalid rows
-                if not row_values or not row_values[0].strip():
-                    continue
-                
-                # Create a new row
-                self.add_row()
-                
-                # Get the widgets for the new row
-                if not self.rows:
-                    continue
-                last_row = self.rows[-1]['widgets']
-                
-                # Set the item name
-                if isinstance(last_row[0], ttk.Combobox):
-                    last_row[0].set(row_values[0])
-                
-                # Set values for other fields
-                field_count = min(len(row_values) - 1, len(last_row) - 2)
-                for i in range(1, field_count + 1):
-                    if i < len(row_values) and i < len(last_row) and hasattr(last_row[i], 'insert'):
-                        last_row[i].delete(0, 'end')
-                        last_row[i].insert(0, row_values[i])
-        else:
-            # If no data or not initialized, just add a blank row
-            logging.info(f"No data found for {new_mode} mode - adding blank row")
-            self.add_row()
-        
-        # 4. Add mode-specific UI elements
-        
-        # Add Kata field if needed
-        if new_mode == "Kata":
-            kata_label = ctk.CTkLabel(self.kata_field_frame, text="Kata:", font=LABEL_FONT)
-            kata_label.pack(side="left", padx=(0, 5))
-            
-            self.kata_amount_entry = ctk.CTkEntry(
-                self.kata_field_frame, 
-                font=ENTRY_FONT,
-                height=38,
-                width=120,
-                validate='key',
-                validatecommand=self.numeric_vcmd
-            )
-            self.kata_amount_entry.pack(side="left")
-            # Add default value '0'
-            self.kata_amount_entry.insert(0, "0") 
-            # Bind update on key release
-            self.kata_amount_entry.bind("<KeyRelease>", self.debounce_update_amounts)
-            self.kata_amount_entry.bind("<FocusIn>", self.select_all_on_focus)
-
-        # 5. Recalculate totals
-        self.update_amounts()
-
-    def add_row(self):
-        mode = self.current_mode.get()
-        if mode == "Patti":
-            num_entry_fields = 6
-        elif mode == "Kata":
-            num_entry_fields = 6
-        elif mode == "Barthe":
-            num_entry_fields = 7
-        else:
-            num_entry_fields = 5
 
-        entries = []
-        row_idx = len(self.rows) + 1
-
-        # Item dropdown with improved styling
-        item_dropdown = ttk.Combobox(
-            self.table_frame,
-            values=ITEM_LIST,
-            font=("Segoe UI", 15),  # Increased from default 13 to 15 (15% increase)
-            state="readonly"
-        )
-        item_dropdown.grid(row=row_idx, column=0, padx=3, pady=3, sticky="nsew")
-        item_dropdown.bind("<<ComboboxSelected>>", lambda e: self.handle_item_selection(e, item_dropdown))
-        self.table_frame.grid_columnconfigure(0, weight=1)
-        entries.append(item_dropdown)
-
-        # Entry fields with improved styling and numeric validation
-        for i in range(1, num_entry_fields):
-            entry = ctk.CTkEntry(
-                self.table_frame,
-                font=("Segoe UI", 15),  # Increased from default 13 to 15 (15% increase)
-                justify="center",
-                height=38,
-                corner_radius=8,
-                border_color=BORDER_COLOR,
-                fg_color="#ffffff",
-                validate='key',
-                validatecommand=self.numeric_vcmd
-            )
-            entry.grid(row=row_idx, column=i, padx=3, pady=3, sticky="nsew")
-            entry.bind("<KeyRelease>", self.debounce_update_amounts)
-            entry.bind("<FocusIn>", self.select_all_on_focus)
-            self.table_frame.grid_columnconfigure(i, weight=1)
-            entries.append(entry)
-
-        # Amount label with improved styling
-        amount_label = ctk.CTkLabel(
-            self.table_frame,
-            text="₹0.00",
-            font=("Segoe UI", 15),  # Increased from default 13 to 15 (15% increase)
-            anchor="e",
-            height=38,
-            corner_radius=8,
-            fg_color="#ffffff",
-            text_color=TEXT_COLOR
-        )
-        amount_label.grid(row=row_idx, column=num_entry_fields, padx=3, pady=3, sticky="nsew")
-        self.table_frame.grid_columnconfigure(num_entry_fields, weight=1)
-        entries.append(amount_label)
-
-        # Add delete button
-        delete_btn = ctk.CTkButton(
-            self.table_frame,
-            text="X",
-            width=40,
+        first_paint = self.table is None
+        if self.table is not None:
+            self.table.pack_forget()
+        self.table = self.tables.get(new_mode)
+        if self.table is None:
+            self.table = self.create_table(new_mode)
+        self.table.pack(fill="both", expand=True)
+        self.model = self.table.model
+        if first_paint:
+            self.after(500, self.prebuild_tables)
+
+        # The Kata amount field belongs to the Kata model and only shows with it
+        if self.model.compiled_mode.kata_deduction:
+            if self.kata_amount_entry is None:
+                self.create_kata_field()
+            elif Money.parse(self.kata_amount_entry.get()) != self.model.kata_amount:
+                # Recovered from the draft log since the field was last shown
+                self.kata_amount_entry.delete(0, "end")
+                self.kata_amount_entry.insert(0, str(self.model.kata_amount))
+            self.kata_field_frame.pack(side="left", padx=(0, 15), before=self.total_label)
+        else:
+            self.kata_field_frame.pack_forget()
+
+        self.scheduler.mark_total()
+
+    def log_draft(self, *record):
+        """Model and customer changes go to the draft log; it is synced to disk about once a second."""
+        self.draft_log.append(list(record))
+        if self._draft_sync is None and self._draft_log_started:
+            self._draft_sync = self.after(DRAFT_SYNC_MS, self.sync_draft_log)
+
+    def draft_records(self):
+        """The records that recreate every mode's rows and the customer name."""
+        records = [["cust", self.customer_var.get()]]
+        for mode, table in self.tables.items():
+            records.extend(model_records(table.model))
+            draft, name = self._draft_ids.get(mode, (None, None))
+            if draft == table.model.draft:
+                records.append(["draft", mode, name])
+        return records
+
+    def sync_draft_log(self):
+        """Hand what was logged since the last sync to the persistence worker to fsync."""
+        self._draft_sync = None
+        if not self._draft_log_started:
+            return  # The file still holds the last session's drafts
+        state = (self.customer_var.get(),) + tuple((mode, table.model.version) for mode, table in self.tables.items())
+        if state == self._synced_state:
+            self.skipped["autosave"] += 1
+            return
+        self._synced_state = state
+        if self.draft_log.needs_checkpoint():
+            self.draft_log.checkpoint(self.draft_records())
+        self.persistence.submit("draft log", self.draft_log.flush)
+
+    def create_kata_field(self):
+        kata_label = ctk.CTkLabel(self.kata_field_frame, text="Kata:", font=LABEL_FONT)
+        kata_label.pack(side="left", padx=(0, 5))
+
+        kata_var = ctk.StringVar()
+        self.kata_amount_entry = ctk.CTkEntry(
+            self.kata_field_frame,
+            font=ENTRY_FONT,
             height=38,
-            fg_color=ERROR_COLOR,
-            hover_color="#d32f2f",
-            corner_radius=8,
-            command=lambda: self.delete_row(row_idx)
+            width=120,
+            textvariable=kata_var,
+            validate='key',
+            validatecommand=self.numeric_vcmd
         )
-        delete_btn.grid(row=row_idx, column=num_entry_fields + 1, padx=3, pady=3)
-        entries.append(delete_btn)
-
-        self.rows.append({"row_index": row_idx, "widgets": entries})
-
-    def handle_item_selection(self, event, dropdown):
+        self.kata_amount_entry.pack(side="left")
+        # Update the total whenever the Kata amount changes
+        kata_var.trace_add("write", lambda *args: self.on_kata_amount_changed(kata_var.get()))
+        # Start from the model's amount ('0' unless recovered)
+        self.kata_amount_entry.insert(0, str(self.model.kata_amount) if self.model.kata_amount else "0")
+        self.kata_amount_entry.bind("<FocusIn>", self.select_all_on_focus)
+
+    def add_row(self, cells=None):
+        self.table.add_row(cells)
+        self.scheduler.mark_total()
+
+    def handle_item_selection(self, table, event, dropdown, row_id):
         """Handle item selection from dropdown, including the 'Add New Item' option."""
         selected_item = dropdown.get()
-        if selected_item == "Add New Item...":
+        if selected_item == ADD_ITEM_CHOICE:
             # Create a dialog for adding new item
             dialog = ctk.CTkInputDialog(
                 text="Enter new item name:",
@@ -577,55 +467,48 @@ class InvoiceApp(ctk.CTk):
             
             if new_item:
                 new_item = new_item.strip().upper()
-                if new_item and new_item not in ITEM_LIST[:-1]:  # Exclude "Add New Item..." from check
-                    # Add the new item before "Add New Item..."
-                    ITEM_LIST.insert(-1, new_item)
-                    # Update all dropdowns
-                    for row_data in self.rows:
-                        for widget in row_data["widgets"]:
-                            if isinstance(widget, ttk.Combobox):
-                                widget["values"] = ITEM_LIST
+                if new_item and self.catalog.add(new_item):
+                    # Every dropdown reads the catalog when it opens, so nothing else to update
                     messagebox.showinfo("Success", f"Item '{new_item}' added successfully!")
-                elif new_item in ITEM_LIST[:-1]:
+                elif new_item in self.catalog:
                     messagebox.showwarning("Warning", "This item already exists!")
                 else:
                     messagebox.showwarning("Warning", "Please enter a valid item name!")
             # Reset the dropdown to empty
             dropdown.set("")
-        else:
-            # Normal item selection, update amounts
-            self.update_amounts(event)
-
-    def delete_row(self, row_idx):
-        """Delete a specific row from the table."""
+        elif row_id is not None:
+            # The item itself is picked up by the item cell's trace
+            self.prefill_rates(table, row_id, selected_item)
+
+    def prefill_rates(self, table, row_id, item):
+        """Fill an empty Rate and Hamali of a table's row with what was last saved for this customer and item."""
+        model = table.model
+        rates = self.rate_cache.get(self.customer_entry.get(), item, model.mode)
+        if rates is None:
+            return
+        column_names = model.compiled_mode.column_names
+        cells = model.cells(row_id)
+        fill = {}
+        for name, text in zip(("rate", "hamali_rate"), rates):
+            column = column_names.index(name)
+            if not cells[column].strip():
+                fill[column] = text
+        if table.fill_cells(row_id, fill):
+            self.scheduler.mark_row(table, row_id)
+
+    def delete_row(self, table, row_id):
+        """Delete a specific row from a table."""
         try:
             # Don't allow deletion if only one row remains
-            if len(self.rows) <= 1:
+            if len(table) <= 1:
                 messagebox.showwarning("Warning", "Cannot delete the last row.")
                 return
 
-            # Find and remove the row
-            for i, row_data in enumerate(self.rows):
-                if row_data["row_index"] == row_idx:
-                    # Destroy all widgets in the row
-                    for widget in row_data["widgets"]:
-                        widget.destroy()
-                    # Remove the row from our list
-                    self.rows.pop(i)
-                    break
-
-            # Reindex remaining rows
-            for i, row_data in enumerate(self.rows, 1):
-                row_data["row_index"] = i
-                for j, widget in enumerate(row_data["widgets"]):
-                    widget.grid(row=i, column=j)
-
-            # Update amounts after deletion
-            self.update_amounts()
+            table.delete_row(row_id)
 
-            # Force update the UI
-            self.update_idletasks()
-            
+            # Update the total after deletion
+            self.scheduler.mark_total()
+    
         except Exception as e:
             logging.error(f"Error deleting row: {e}")
             messagebox.showerror("Error", "Failed to delete row. Please try again.")
@@ -633,429 +516,90 @@ class InvoiceApp(ctk.CTk):
     def clear_rows(self):
         """Clear all rows except one."""
         try:
-            # Keep only the first row
-            while len(self.rows) > 1:
-                row_data = self.rows[-1]
-                for widget in row_data["widgets"]:
-                    widget.destroy()
-                self.rows.pop()
-
-            # Reset the first row
-            first_row = self.rows[0]
-            for widget in first_row["widgets"]:
-                if isinstance(widget, (ctk.CTkEntry, ttk.Combobox)):
-                    widget.delete(0, 'end')
-                elif isinstance(widget, ctk.CTkLabel):
-                    widget.configure(text="₹0.00")
-
-            # Update amounts
-            self.update_amounts()
-            
-            # Force update the UI
-            self.update_idletasks()
-
+            self.table.clear()
+            self.scheduler.mark_total()
+    
         except Exception as e:
             logging.error(f"Error clearing rows: {e}")
             messagebox.showerror("Error", "Failed to clear rows. Please try again.")
 
     def update_amounts(self, event=None):
-        """Update all amount calculations in real time (no debounce)."""
-        self._do_update_amounts()
+        """Repaint every visible row and the total on the next idle tick."""
+        self.scheduler.mark_table(self.table)
+        self.scheduler.mark_total()
+
+    def on_cell_changed(self, table, row_id, column, text):
+        """Store an edit in the table it was typed in; the row is recomputed (once per burst) by the scheduler."""
+        if table.model.set_text(row_id, column, text):
+            self.scheduler.mark_row(table, row_id)
+
+    def on_kata_amount_changed(self, text):
+        """Deduct the Kata amount from the total, flagging unparseable input."""
+        if not self.kata_amount_entry:
+            return
+        kata_amount = Money.parse(text)
+        self.model.kata_amount = kata_amount
+        # Add visual feedback for invalid input
+        if text.strip() and kata_amount == 0 and text != '0':
+            self.kata_amount_entry.configure(fg_color="pink")
+        else:
+            # Reset color on valid input
+            self.kata_amount_entry.configure(fg_color=ctk.ThemeManager.theme["CTkEntry"]["fg_color"])
+        self.scheduler.mark_total()
 
-    def _do_update_amounts(self):
-        """Actually perform the amount updates."""
+    def paint_total(self):
         try:
-            logging.debug("Updating amounts for all rows")
-            total = 0.0
-            mode = self.current_mode.get()
-
-            # Calculate sum of row amounts
-            for row_data in self.rows:
-                widgets = row_data["widgets"]
-                amount = 0.0 # Default amount
-                try:
-                    if mode == "Patti":
-                        # Item [0], Pkt [1], Qty [2], + [3], Rate [4], Hamali [5], AmountLabel [6]
-                        if len(widgets) > 4:
-                            qty = validate_float(widgets[2].get())
-                            plus_value = validate_float(widgets[3].get())  # Get value from + column
-                            qty = qty + plus_value  # Add the plus value to quantity
-                            rate = validate_float(widgets[4].get())
-                            pkt = validate_float(widgets[1].get())
-                            hamali_rate = validate_float(widgets[5].get())
-                            # Calculate hamali based on number of packets
-                            hamali_amount = pkt * hamali_rate
-                            amount = (qty * rate) - hamali_amount  # Subtract hamali amount
-                    elif mode == "Kata":
-                        # Item [0], Net [1], Less% [2], Final Wt [3], Rate [4], HamaliRate [5], AmountLabel [6]
-                         if len(widgets) > 5:
-                            net = validate_float(widgets[1].get())
-                            less = validate_float(widgets[2].get())
-                            final_wt = net * (1 - less / 100.0) if less < 100 else 0.0
-                            # Display the calculated Final Wt
-                            widgets[3].delete(0, 'end')
-                            widgets[3].insert(0, f"{final_wt:.2f}")
-                            rate = validate_float(widgets[4].get())
-                            hamali_rate = validate_float(widgets[5].get())
-                            # Calculate packets based on net weight (e.g., if 60kg/packet)
-                            packets = int(net / 60) if net > 0 else 0 
-                            hamali_amount = packets * hamali_rate
-                            amount = (final_wt * rate) - hamali_amount  # Subtract hamali amount
-                    elif mode == "Barthe":
-                        # Item [0], Pkt [1], Wt   |+    |TQty |Rate |Ham |Amount |
-                        # |7chars|4chr|4chr |4chr |4chr |5chr |4chr|6chars |
-                         if len(widgets) > 6:
-                            pkt = validate_float(widgets[1].get())
-                            wt_per_pkt = validate_float(widgets[2].get())
-                            adj = validate_float(widgets[3].get()) # Adjustment weight
-                            total_qty = (pkt * wt_per_pkt) + adj
-                            # Display the calculated Total Qty
-                            widgets[4].delete(0, 'end')
-                            widgets[4].insert(0, f"{total_qty:.2f}")
-                            rate = validate_float(widgets[5].get()) # Rate per kg
-                            hamali_rate = validate_float(widgets[6].get())
-                            # Calculate hamali based on number of packets
-                            hamali_amount = pkt * hamali_rate
-                            amount = (total_qty * rate) - hamali_amount  # Subtract hamali amount
-                    
-                    # Update the amount label for the current row
-                    # The amount label is always the second-to-last widget (before delete button)
-                    if len(widgets) > 0:
-                        widgets[-2].configure(text=f"₹{amount:.2f}")
-                    total += amount
-
-                except IndexError:
-                     logging.error(f"Index error calculating amount for row. Widgets: {len(widgets)}")
-                except Exception as e:
-                    logging.error(f"Error calculating amount: {e}")
-                    if len(widgets) > 0:
-                         widgets[-2].configure(text="₹Error") # Indicate error on the row
-
-            # --- Add Kata Amount if applicable ---
-            kata_amount = 0.0
-            if mode == "Kata" and self.kata_amount_entry:
-                try:
-                    kata_amount = validate_float(self.kata_amount_entry.get())
-                    # Add visual feedback for invalid input (optional)
-                    if self.kata_amount_entry.get().strip() and kata_amount == 0 and self.kata_amount_entry.get() != '0':
-                         self.kata_amount_entry.configure(fg_color="pink")
-                    else:
-                         # Reset color on valid input
-                         self.kata_amount_entry.configure(fg_color=ctk.ThemeManager.theme["CTkEntry"]["fg_color"]) 
-                except Exception as e:
-                    logging.error(f"Error reading Kata amount: {e}")
-                    # Maybe provide visual feedback on error
-                    self.kata_amount_entry.configure(fg_color="pink")
-            
-            total -= kata_amount # Deduct validated Kata amount from total
-            # --- End Add Kata Amount ---
-
-            self.total_label.configure(text=f"Total Amount: ₹{total:.2f}")
-
+            text = f"Total Amount: ₹{self.model.total:.2f}"
+            if text == self.total_label.cget("text"):
+                self.skipped["redraw"] += 1
+                return
+            self.total_label.configure(text=text)
         except Exception as e:
-            error_msg = f"Error updating amounts: {str(e)}"
-            logging.error(error_msg)
+            logging.error(f"Error updating amounts: {e}")
             self.total_label.configure(text="₹Error")
 
-    def save_to_excel(self, show_popup=True, filename=None):
-        try:
-            # Define the save directory
-            save_dir = INVOICE_SAVE_DIR
-        
-            # Ensure the save directory exists, create if not
-            os.makedirs(save_dir, exist_ok=True) 
-        
-            # Determine the filename
-            if filename is not None:
-                # If filename is provided, assume it's just the name, not full path yet
-                full_save_path = os.path.join(save_dir, filename) 
-            else:
-                # Create the filename based on the current date
-                date_str = datetime.now().strftime('%Y-%m-%d')
-                base_filename = f"Invoice_{date_str}.xlsx"
-                full_save_path = os.path.join(save_dir, base_filename)
-            
-            logging.info(f"Target save path: {full_save_path}")
+    def collect_invoice(self):
+        """Freeze the model's already-parsed lines into an Invoice for save and print."""
+        # Edits still waiting for the idle tick have not been recomputed yet
+        self.scheduler.flush()
+        return self.model.snapshot(self.customer_entry.get().strip())
 
-            # Get Invoice Data
-            customer = self.customer_entry.get().strip() or "Unknown Customer"
-            mode = self.current_mode.get()
-            
-            headers = getattr(self, '_current_headers', []) 
-            if not headers:
-                if mode == "Patti":
-                    headers = ["Item", "Packet", "Quantity", "+", "Rate", "Hamali", "Amount"]
-                elif mode == "Kata":
-                    headers = ["Item", "Net Wt", "Less%", "Rate", "Hamali Rate", "Amount"]
-                elif mode == "Barthe":
-                    headers = ["Item", "Packet", "Weight", "+/-", "Rate", "Hamali", "Amount"]
-                else: 
-                    headers = ["Col1", "Col2", "Col3", "Col4", "Col5", "Col6", "Amount"]
-
-            data_rows = []
-            total_invoice_amount = 0.0
-            kata_amount = 0.0
-            if mode == "Kata" and self.kata_amount_entry:
-                kata_amount = validate_float(self.kata_amount_entry.get())
-            for row_data in self.rows:
-                widgets = row_data["widgets"]
-                row_values = []
-                for w in widgets:
-                    if isinstance(w, (ctk.CTkEntry, ttk.Combobox)):
-                        row_values.append(w.get())
-                    elif isinstance(w, ctk.CTkLabel):
-                        text = w.cget("text").replace('₹', '').replace('Error', '0').strip()
-                        row_values.append(text)
-                    else:
-                        row_values.append("")
-
-                if not row_values or not row_values[0]:
-                    continue
-            
-                try:
-                    if mode == "Patti" and len(row_values) >= 6:
-                        # Calculate hamali amount
-                        pkt = float(row_values[1].replace('Error', '0').strip() or 0)
-                        qty = float(row_values[2].replace('Error', '0').strip() or 0)
-                        plus_value = float(row_values[3].replace('Error', '0').strip() or 0)
-                        total_qty = qty + plus_value
-                        rate = float(row_values[4].replace('Error', '0').strip() or 0)
-                        hamali_rate = float(row_values[5].replace('Error', '0').strip() or 0)
-                        hamali_amount = int(pkt * hamali_rate)
-                        amount_val = float(row_values[6].replace('₹', '').replace('Error', '0').strip() or 0)
-                        amount_str = f"{amount_val:.2f}"
-                        data_rows.append(row_values)
-                        total_invoice_amount += amount_val
-                    elif mode == "Kata" and len(row_values) >= 7:
-                        # Calculate hamali amount
-                        net = float(row_values[1].replace('Error', '0').strip() or 0)
-                        packets = int(net / 60) if net > 0 else 0
-                        hamali_rate = float(row_values[5].replace('Error', '0').strip() or 0)
-                        hamali_amount = int(packets * hamali_rate)
-                        amount_val = float(row_values[6].replace('₹', '').replace('Error', '0').strip() or 0)
-                        amount_str = f"{amount_val:.2f}"
-                        data_rows.append(row_values)
-                        total_invoice_amount += amount_val
-                    elif mode == "Barthe" and len(row_values) >= 8:
-                        # Calculate hamali amount
-                        pkt = float(row_values[1].replace('Error', '0').strip() or 0)
-                        ham_rate = float(row_values[6].replace('Error', '0').strip() or 0)
-                        ham_amount = pkt * ham_rate
-                        amount_val = float(row_values[7].replace('₹', '').replace('Error', '0').strip() or 0)
-                        amount_str = f"{amount_val:.2f}"
-                        data_rows.append(row_values)
-                        total_invoice_amount += amount_val
-                except Exception as fmt_e:
-                    logging.error(f"Error formatting row: {fmt_e}")
-
-            if not data_rows:
-                if show_popup:
-                    messagebox.showwarning("No Data", "No data entered to save.")
-                return
-
-            # Excel Writing Logic with proper workbook handling
-            try:
-                if os.path.exists(full_save_path):
-                    wb = load_workbook(full_save_path)
-                else:
-                    wb = Workbook()
-                    
-                # Check if mode sheet exists, create or get it
-                if mode in wb.sheetnames:
-                    ws = wb[mode]
-                else:
-                    if len(wb.sheetnames) > 0:
-                        # If there are sheets but none match our mode, create new one
-                        ws = wb.create_sheet(title=mode)
-                    else:
-                        # If it's a new workbook, rename the default sheet
-                        ws = wb.active
-                        ws.title = mode
-
-                # Only write headers if the first row is empty or not matching
-                expected_headers = ["Timestamp", "Customer"] + headers
-                first_row = [cell.value for cell in ws[1]] if ws.max_row >= 1 else []
-                if first_row != expected_headers:
-                    ws.insert_rows(1)
-                    for col, value in enumerate(expected_headers, 1):
-                        ws.cell(row=1, column=col, value=value)
-
-                # Write data
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                for row in data_rows:
-                    ws.append([timestamp, customer] + row)
-
-                # --- Attempt to save the file --- 
-                primary_save_path = full_save_path
-                desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-                fallback_save_path = os.path.join(desktop_path, os.path.basename(primary_save_path))
-
-                try:
-                    wb.save(primary_save_path)
-                    logging.info(f"Successfully saved invoice data to {primary_save_path} (Sheet: {mode})")
-                    if show_popup:
-                        messagebox.showinfo("Saved", f"Invoice data saved to:\n{primary_save_path}\n(Sheet: {mode})")
-
-                except (PermissionError, OSError, IOError) as e_primary:
-                    logging.warning(f"Failed to save to primary path {primary_save_path}: {e_primary}. Attempting fallback to Desktop.")
-                    try:
-                        # Ensure fallback directory exists (Desktop usually does, but good practice)
-                        os.makedirs(desktop_path, exist_ok=True)
-                        wb.save(fallback_save_path)
-                        logging.info(f"Successfully saved invoice data to fallback path: {fallback_save_path} (Sheet: {mode})")
-                        if show_popup:
-                            messagebox.showinfo("Saved to Desktop", f"Could not save to D:\\invoices.\nFile saved to Desktop instead:\n{fallback_save_path}\n(Sheet: {mode})")
-                    except Exception as e_fallback:
-                        error_msg = f"Failed to save to both primary location and Desktop.\nPrimary Error: {e_primary}\nFallback Error: {e_fallback}"
-                        logging.error(error_msg)
-                        if show_popup:
-                            messagebox.showerror("Save Error", error_msg)
-
-            except Exception as e:
-                error_msg = f"Error saving Excel file to:\n{full_save_path}\n\nError: {str(e)}"
-                logging.error(error_msg)
-                if show_popup:
-                    messagebox.showerror("Save Error", error_msg)
-
-        except Exception as e:
-            error_msg = f"Unexpected error during save operation: {str(e)}"
-            logging.exception(error_msg)
-            if show_popup:
-                messagebox.showerror("Error", error_msg)
+    def notify(self, kind, title, message):
+        """Show a message box for a background job; Tk itself is only touched on the UI thread."""
+        self.scheduler.call_soon_threadsafe(getattr(messagebox, f"show{kind}"), title, message)
 
     def format_line(self, left, right, width=42):
         space = width - len(left) - len(right)
         return f"{left}{' ' * max(space, 0)}{right}"
 
-    def generate_print_content(self):
-        lines = []
-        customer = self.customer_entry.get().strip() or "N/A"
-        mode = self.current_mode.get()
-        max_width = 48  # updated width for your printer
-
-        # Header
-        lines.append("G.V. Mahant Brothers".center(max_width))
-        lines.append(datetime.now().strftime("%d-%b-%Y %H:%M").center(max_width))
-        # Add 'Customer Name: <name>' centered
-        lines.append(f"Customer Name: {customer}".center(max_width))
-        lines.append("-" * max_width)
-        # Define and print header before looping rows
-        if mode == "Patti":
-            header_fmt = "{:<8} {:>4} {:>5} {:>7} {:>6}{:>14}"
-            lines.append(header_fmt.format("Item", "Pkt", "Qty", "Rate", "Hm", "Amount"))
-        elif mode == "Kata":
-            # Narrower Item column, Net closer, Amount inside border
-            header_fmt = "{:<9}{:>6} {:>7}{:>6}{:>6}{:>10}"
-            lines.append(header_fmt.format("Item", "Net", "FWt", "Rt", "Hm", "Amount"))
-        elif mode == "Barthe":
-            header_fmt = "{:<8}{:>5}{:>6}{:>8}{:>5}{:>6}{:>10}"
-            lines.append(header_fmt.format("Item", "Pkt", "Wt", "TQty", "Rt", "Hm", "Amount"))
-        else:
-            header_fmt = None
-            lines.append("Unknown mode".center(max_width))
-        lines.append("-" * max_width)
-
-        total = 0.0
-        if header_fmt:
-            for row_data in self.rows:
-                widgets = row_data["widgets"]
-                row_values = []
-                for w in widgets:
-                    if isinstance(w, (ctk.CTkEntry, ttk.Combobox)):
-                        row_values.append(w.get())
-                    elif isinstance(w, ctk.CTkLabel):
-                        text = w.cget("text").replace('₹', '').replace('Error', '0').strip()
-                        row_values.append(text)
-                    else:
-                        row_values.append("")
-
-                if not row_values or not row_values[0]:
-                    continue
-                values = [w.get().strip() if hasattr(w, 'get') else "" for w in widgets]
-                amount_label = widgets[-2]
-                amt = amount_label.cget("text").replace("₹", "").strip()
-                try:
-                    amt_val = float(amt)
-                    total += amt_val
-                except:
-                    amt_val = 0.0
-                if mode == "Patti" and len(values) >= 6:
-                    try:
-                        pkt = float(values[1] or 0)
-                        hamali_rate = float(values[5] or 0)
-                        ham_amount = pkt * hamali_rate
-                    except:
-                        ham_amount = 0
-                    lines.append(header_fmt.format(
-                        values[0][:8],   # Item (truncate to 8)
-                        values[1],       # Pkt
-                        values[2],       # Qty
-                        values[4],       # Rate
-                        f"{ham_amount:.0f}", # Hm (calculated)
-                        f"{amt_val:.2f}" # Amount
-                    ))
-                elif mode == "Kata" and len(values) >= 7:
-                    try:
-                        net = float(values[1] or 0)
-                        final_wt = float(values[3] or 0)
-                        rate = float(values[4] or 0)
-                        hamali_rate = float(values[5] or 0)
-                        # Calculate packets as int(net / 60)
-                        packets = int(net / 60) if net > 0 else 0
-                        ham_amount = packets * hamali_rate
-                    except:
-                        net = final_wt = rate = hamali_rate = packets = ham_amount = 0
-                    lines.append(header_fmt.format(
-                        values[0][:9],   # Item (truncate to 9)
-                        values[1],        # Net
-                        values[3],        # FWt
-                        values[4],        # Rt
-                        f"{ham_amount:.0f}", # Hm (calculated value)
-                        f"{amt_val:.2f}"  # Amount (inside the lines)
-                    ))
-                elif mode == "Barthe" and len(values) >= 8:
-                    try:
-                        pkt = float(values[1] or 0)
-                        wt = float(values[2] or 0)
-                        tqty = float(values[4] or 0)
-                        rate = float(values[5] or 0)
-                        ham_rate = float(values[6] or 0)
-                        ham_amount = pkt * ham_rate
-                    except:
-                        pkt = wt = tqty = rate = ham_rate = ham_amount = 0
-                    lines.append(header_fmt.format(
-                        values[0][:8],   # Item (truncate to 8)
-                        values[1],       # Pkt
-                        values[2],       # Wt
-                        f"{tqty:.2f}",   # TQty
-                        values[5],       # Rt
-                        f"{ham_amount:.0f}", # Hm
-                        f"{amt_val:.2f}" # Amt
-                    ))
-
-        if mode == "Kata" and hasattr(self, 'kata_amount_entry') and self.kata_amount_entry:
-            kata_val = validate_float(self.kata_amount_entry.get())
-            total -= kata_val
-            kata_line = f"    Kata Amount:{kata_val:>30.2f}"
-            lines.append(kata_line)
-
-        lines.append("-" * max_width)
-        # Indent and center Total Amount
-        total_line = f"Total Amount: {total:.2f}"
-        lines.append(total_line.center(max_width))
-        lines.append("-" * max_width)
-        lines.extend(["\n"] * 3)
-        lines.append(chr(27) + chr(105))  # Cut command
-
+    def generate_print_content(self, invoice=None):
+        """The receipt lines; an unchanged invoice within the same minute reuses the last render."""
+        if invoice is None:
+            invoice = self.collect_invoice()
+        now = datetime.now()
+        key = (invoice.content_hash, invoice.number, now.strftime("%Y-%m-%d %H:%M"))
+        cached = self._receipt
+        if cached is not None and cached[0] == key:
+            self.skipped["receipt"] += 1
+            return cached[1]
+        lines = render_receipt(invoice, now)
+        self._receipt = (key, lines)
         return lines
 
-    def save_for_print(self):
-        """Prints the generated content to the default printer."""
+    def save_for_print(self, invoice):
+        """Prints an invoice snapshot to the default printer (runs on the persistence worker)."""
+        printer_name = "the default printer"
         try:
+            import win32print  # Loaded on first print, not at startup
+
+            saved = self._last_saved
+            if saved is not None and saved.content_hash == invoice.content_hash:
+                invoice = saved  # Saved just before printing: print its invoice number
+
             printer_name = win32print.GetDefaultPrinter()
             logging.info(f"Attempting to print to default printer: {printer_name}")
             
-            lines = self.generate_print_content()
+            lines = self.generate_print_content(invoice)
             print_content = "\r\n".join(lines)
             
             # First try UTF-8 encoding for Kannada text
@@ -1069,35 +613,84 @@ class InvoiceApp(ctk.CTk):
                     # If both fail, fall back to cp437 with replacement
                     print_bytes = print_content.encode('cp437', errors='replace')
 
-            # Use win32print for direct RAW printing
-            hPrinter = win32print.OpenPrinter(printer_name)
-            try:
-                # Job name "Invoice", Datatype "RAW"
-                hJob = win32print.StartDocPrinter(hPrinter, 1, ("Invoice", None, "RAW"))
-                try:
-                    win32print.StartPagePrinter(hPrinter)
-                    win32print.WritePrinter(hPrinter, print_bytes)
-                    win32print.EndPagePrinter(hPrinter)
-                finally:
-                    win32print.EndDocPrinter(hPrinter)
-            finally:
-                win32print.ClosePrinter(hPrinter)
-
+            self.send_to_printer(printer_name, print_bytes)
             logging.info("Invoice successfully sent to printer.")
-            messagebox.showinfo("Success", "Invoice sent to printer!")
+            try:
+                # Kept byte for byte, so a reprint needs no rendering
+                self.receipts.append(invoice.number, datetime.now().date(), print_bytes)
+            except Exception as e:
+                logging.error(f"Error archiving receipt for invoice {invoice.number}: {e}")
+            self.notify("info", "Success", "Invoice sent to printer!")
 
         except Exception as e:
             error_msg = f"Error printing invoice: {str(e)}"
             logging.error(error_msg)
             logging.error("Printer encoding error - trying to print Kannada text")
-            messagebox.showerror("Print Error", f"Could not print to {printer_name}.\nCheck if your printer supports Kannada text.\n\nError: {e}")
+            self.notify("error", "Print Error", f"Could not print to {printer_name}.\nCheck if your printer supports Kannada text.\n\nError: {e}")
+
 
+    def send_to_printer(self, printer_name, print_bytes):
+        """Send raw bytes to a printer as one job."""
+        import win32print
+
+        # Use win32print for direct RAW printing
+        hPrinter = win32print.OpenPrinter(printer_name)
+        try:
+            # Job name "Invoice", Datatype "RAW"
+            hJob = win32print.StartDocPrinter(hPrinter, 1, ("Invoice", None, "RAW"))
+            try:
+                win32print.StartPagePrinter(hPrinter)
+                win32print.WritePrinter(hPrinter, print_bytes)
+                win32print.EndPagePrinter(hPrinter)
+            finally:
+                win32print.EndDocPrinter(hPrinter)
+        finally:
+            win32print.ClosePrinter(hPrinter)
+
+    def reprint(self, number):
+        """Send an archived receipt to the printer again, unchanged (runs on the persistence worker)."""
+        printer_name = "the default printer"
+        try:
+            receipt = self.receipts.find(number)
+            if receipt is None:
+                self.notify("warning", "Not Found", f"No printed receipt for invoice {number}.\n"
+                                                    "Reopen the invoice and print it instead.")
+                return
+            import win32print  # Loaded on first print, not at startup
+
+            printer_name = win32print.GetDefaultPrinter()
+            self.send_to_printer(printer_name, self.receipts.read(receipt))
+            self.receipts.reprinted += 1
+            logging.info(f"Reprinted invoice {number} ({receipt.length} bytes from {receipt.day})")
+            self.notify("info", "Success", f"Invoice {number} sent to printer again!")
+        except Exception as e:
+            logging.error(f"Error reprinting invoice {number}: {e}")
+            self.notify("error", "Print Error", f"Could not reprint to {printer_name}.\n\nError: {e}")
+
+    def reprint_async(self):
+        dialog = ctk.CTkInputDialog(text="Invoice number:", title="Reprint Receipt")
+        text = (dialog.get_input() or "").strip()
+        if not text:
+            return
+        if not text.isdigit():
+            messagebox.showwarning("Warning", "Please enter an invoice number.")
+            return
+        if not self.persistence.submit(("reprint", int(text)), self.reprint, int(text)):
+            messagebox.showwarning("Busy", "Saves are still being written. Please try again in a moment.")
+
+    def print_async(self, invoice):
+        if not self.persistence.submit(("print",) + self.draft_key(invoice)[1:], self.save_for_print, invoice):
+            messagebox.showwarning("Busy", "Saves are still being written. Please try again in a moment.")
 
     def show_print_preview(self):
         """Shows a Toplevel window with a preview of the print output."""
         try:
+            # Parse the rows once for both the auto-save and the preview
+            invoice = self.collect_invoice()
+
             # Auto-save before showing preview
-            self.save_to_excel(show_popup=False)
+            self.persistence.submit(self.draft_key(invoice), self.save_invoice, invoice, show_popup=False,
+                                    draft_seq=self.draft_log.seq(invoice.mode), draft=self.draft_id(self.model))
             
             preview = ctk.CTkToplevel(self)
             preview.title("Print Preview")
@@ -1129,7 +722,7 @@ class InvoiceApp(ctk.CTk):
             preview_text.pack(fill="both", expand=True)
             
             # Generate print content and display it
-            lines = self.generate_print_content()
+            lines = self.generate_print_content(invoice)
             # Join lines, but remove the final cut command for preview
             preview_content = "\n".join(lines[:-1]) if lines else "" 
             
@@ -1148,7 +741,7 @@ class InvoiceApp(ctk.CTk):
                 button_frame,
                 text="Print",
                 # Lambda calls destroy first, then the print function
-                command=lambda: [preview.destroy(), self.save_for_print()], 
+                command=lambda: [preview.destroy(), self.print_async(invoice)], 
                 width=120
             ).grid(row=0, column=0, padx=5, pady=5, sticky="ew")
 
@@ -1183,8 +776,7 @@ class InvoiceApp(ctk.CTk):
 
     def set_mode(self, mode):
         """Set the current mode and update button colors."""
-        previous_mode = self.current_mode.get()  # Save old mode first
-        self.current_mode.set(mode)  # Then update to the new mode
+        self.current_mode.set(mode)
         
         # Update button colors for all modes
         for btn_mode, btn in self.mode_buttons.items():
@@ -1203,8 +795,7 @@ class InvoiceApp(ctk.CTk):
                     hover_color="#d0d0d0"
                 )
         
-        # Pass previous_mode to switch_mode
-        self.switch_mode(previous_mode)
+        self.switch_mode()
 
     def only_numeric_input(self, P):
         # Allow empty string, integer, or float
@@ -1212,11 +803,6 @@ class InvoiceApp(ctk.CTk):
             return True
         return False
 
-    def debounce_update_amounts(self, event=None):
-        if hasattr(self, '_debounce_after_id') and self._debounce_after_id:
-            self.after_cancel(self._debounce_after_id)
-        self._debounce_after_id = self.after(300, self._do_update_amounts)  # 300ms debounce
-
     def select_all_on_focus(self, event):
         event.widget.select_range(0, 'end')
         event.widget.icursor('end')
@@ -1241,19 +827,304 @@ class InvoiceApp(ctk.CTk):
             logging.error(f"Error opening folder {save_dir}: {e}")
             messagebox.showerror("Error", f"Could not open the folder.\nError: {e}")
 
-    def save_to_excel_async(self):
-        threading.Thread(target=self.save_to_excel, daemon=True).start()
+    def save_invoice(self, invoice, show_popup=True, draft_seq=None, draft=None):
+        """Append the invoice to today's journal; the xlsx is built from the journal on export.
+
+        draft_seq is the draft log position the invoice was taken at; once
+        saved, a crash no longer offers to recover it. draft (see draft_id)
+        names the draft it was taken from, so saving it again unchanged is skipped.
+        """
+        if not invoice.lines:
+            if show_popup:
+                self.notify("warning", "No Data", "No data entered to save.")
+            return
+        if invoice.number is not None:
+            # Reopened from the journal: correct it under its own number
+            self.save_correction(invoice, show_popup, draft_seq)
+            return
+        when = datetime.now()
+        today = when.date()
+        try:
+            number = self.saved_hashes.find(invoice.content_hash, draft) if draft is not None else None
+            if number is not None:
+                # This draft was saved as it is (Save twice, or Print then Save): one O(1) lookup, no write
+                self.skipped["save"] += 1
+                self._last_saved = replace(invoice, number=number)
+                self.mark_draft_saved(invoice.mode, draft_seq)
+                logging.info(f"Invoice {number} is unchanged since it was saved; not saved again "
+                             f"({self.skipped['save']} repeat save(s) skipped)")
+                if show_popup:
+                    self.notify("info", "Already Saved", f"This invoice was already saved as number {number}.")
+                return
+            invoice = replace(invoice, number=self.index.allocate())
+            try:
+                # Invoices saved to today's workbook before the journal existed come along once
+                self.journal.import_workbook(os.path.join(INVOICE_SAVE_DIR, workbook_name(today)), today)
+                path, offset = self.journal.append(invoice, when)
+                try:
+                    self.index.add(invoice.number, today, offset)
+                except Exception as e:
+                    # catch_up() indexes it from the journal on the next start
+                    logging.error(f"Error indexing invoice {invoice.number} in {INDEX_PATH}: {e}")
+            except (PermissionError, OSError, IOError) as e_primary:
+                logging.warning(f"Failed to save to journal {JOURNAL_DIR}: {e_primary}. Attempting fallback to Desktop.")
+                desktop_journal = InvoiceJournal(os.path.join(os.path.expanduser("~"), "Desktop", "invoice_journal"))
+                path, _ = desktop_journal.append(invoice, when)
+            if draft is not None:
+                self.saved_hashes.add(invoice.content_hash, draft, invoice.number)
+            self._last_saved = invoice
+            logging.info(f"Saved {invoice.mode} invoice {invoice.number} for "
+                         f"{invoice.customer or 'Unknown Customer'} to {path}")
+            self.mark_draft_saved(invoice.mode, draft_seq)
+            try:
+                self.store.add(invoice, when)
+            except Exception as e:
+                # The journal has it; "python invoice_store.py rebuild" re-indexes it
+                logging.error(f"Error indexing invoice in {STORE_PATH}: {e}")
+            self.rate_cache.record_invoice(invoice)
+            if show_popup:
+                self.notify("info", "Saved", f"Invoice {invoice.number} saved.\n(Sheet: {invoice.mode})")
+        except Exception as e:
+            error_msg = f"Error saving invoice: {str(e)}"
+            logging.error(error_msg)
+            if show_popup:
+                self.notify("error", "Save Error", error_msg)
+
+    def save_correction(self, invoice, show_popup=True, draft_seq=None):
+        """Save a reopened invoice in place of the saved one with its number (persistence worker).
+
+        The corrected record goes to the journal of the day the invoice was
+        first saved and replaces it there, so day totals count it once.
+        """
+        try:
+            location = self.index.locate(invoice.number)
+            if location is None:
+                raise LookupError(f"invoice {invoice.number} is not in {INDEX_PATH}")
+            offset, (when, previous) = self.journal.latest(*location)
+            if previous.content_hash == invoice.content_hash:
+                self.skipped["save"] += 1
+                self._last_saved = invoice
+                self.mark_draft_saved(invoice.mode, draft_seq)
+                logging.info(f"Reopened invoice {invoice.number} is unchanged; not saved again")
+                if show_popup:
+                    self.notify("info", "Already Saved", f"Invoice {invoice.number} is unchanged.")
+                return
+            self.journal.append(invoice, when, replaces=offset)
+            self._last_saved = invoice
+            logging.info(f"Corrected {invoice.mode} invoice {invoice.number} saved {when:%Y-%m-%d %H:%M:%S}")
+            self.mark_draft_saved(invoice.mode, draft_seq)
+            try:
+                # Its printed receipt is out of date; printing the correction archives the new one
+                self.receipts.forget(invoice.number, datetime.now().date())
+            except Exception as e:
+                logging.error(f"Error updating the receipt archive for invoice {invoice.number}: {e}")
+            try:
+                self.store.replace(previous, invoice, when)
+            except Exception as e:
+                logging.error(f"Error re-indexing invoice {invoice.number} in {STORE_PATH}: {e}")
+            self.rate_cache.record_invoice(invoice)
+            if show_popup:
+                self.notify("info", "Saved", f"Invoice {invoice.number} corrected.\n(Sheet: {invoice.mode})")
+        except Exception as e:
+            error_msg = f"Error saving corrected invoice {invoice.number}: {str(e)}"
+            logging.error(error_msg)
+            if show_popup:
+                self.notify("error", "Save Error", error_msg)
+
+    def mark_draft_saved(self, mode, draft_seq):
+        """Tell the draft log the mode's draft as of draft_seq is saved (persistence worker)."""
+        if draft_seq is not None:
+            self.draft_log.saved(mode, draft_seq)
+            self.draft_log.flush()
+
+    def draft_key(self, invoice):
+        """Queue key for saving the invoice on screen: repeat saves of one draft coalesce."""
+        return ("save", self.model.mode, self.model.draft, invoice.customer)
+
+    def draft_id(self, model):
+        """Names the draft a model holds, unique across runs; Clear starts a new one.
+
+        The name goes to the draft log, so a draft recovered after a crash
+        keeps it and SavedHashes still knows what it was saved as.
+        """
+        draft, name = self._draft_ids.get(model.mode, (None, None))
+        if draft != model.draft:
+            name = f"{self.session}-{model.mode}-{model.draft}"
+            self._draft_ids[model.mode] = (model.draft, name)
+            self.log_draft("draft", model.mode, name)
+        return name
+
+    def save_invoice_async(self):
+        # Collect on the UI thread; the worker only writes
+        invoice = self.collect_invoice()
+        if not self.persistence.submit(self.draft_key(invoice), self.save_invoice, invoice,
+                                       draft_seq=self.draft_log.seq(invoice.mode), draft=self.draft_id(self.model)):
+            messagebox.showwarning("Busy", "Saves are still being written. Please try again in a moment.")
+
+    def reopen_invoice(self):
+        """Load a saved invoice by number into its mode's table; saving it then corrects it in place."""
+        dialog = ctk.CTkInputDialog(text="Invoice number:", title="Reopen Invoice")
+        text = (dialog.get_input() or "").strip()
+        if not text:
+            return
+        if not text.isdigit():
+            messagebox.showwarning("Warning", "Please enter an invoice number.")
+            return
+        try:
+            location = self.index.locate(int(text))
+            if location is None:
+                messagebox.showwarning("Not Found", f"No saved invoice number {text}.")
+                return
+            _, (when, invoice) = self.journal.latest(*location)  # as last corrected
+        except Exception as e:
+            logging.error(f"Error reopening invoice {text}: {e}")
+            messagebox.showerror("Error", f"Could not open invoice {text}.\nError: {e}")
+            return
+        compiled = MODES[invoice.mode]
+        table = self.tables.get(invoice.mode)
+        if table is None:
+            table = self.create_table(invoice.mode)
+        elif self.has_unsaved_draft(table) and not messagebox.askyesno(
+                "Replace?", f"The {invoice.mode} invoice being typed is not saved.\n"
+                            f"Replace it with invoice {invoice.number}?"):
+            return
+        table.restore([(None, compiled.cells_of(line.item, line.texts)) for line in invoice.lines])
+        table.model.kata_amount = invoice.kata_amount
+        table.model.reopened = invoice.number
+        self.customer_var.set(invoice.customer)
+        self.set_mode(invoice.mode)
+        logging.info(f"Reopened invoice {invoice.number} saved {when:%Y-%m-%d %H:%M:%S}")
+
+    def has_unsaved_draft(self, table):
+        """True if a table holds lines that changed since they were last saved."""
+        model = table.model
+        self.scheduler.flush()  # Lines of the last keystrokes may still be waiting for the idle tick
+        return any(line.item for line in model.lines()) and not self.draft_log.is_saved(model.mode)
+
+    def export_day_workbook(self, day=None, show_popup=True):
+        """Build Invoice_<date>.xlsx from the day's journal."""
+        day = day or datetime.now().date()
+        path = os.path.join(INVOICE_SAVE_DIR, workbook_name(day))
+        try:
+            journal_path = self.journal.path_for(day)
+            journal_size = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+            if journal_size and self._exported.get(day) == journal_size and os.path.exists(path):
+                # Nothing saved since the last export: the workbook is already current
+                self.skipped["export"] += 1
+                logging.info(f"{path} is up to date; export skipped")
+                if show_popup:
+                    self.notify("info", "Exported", f"Invoices exported to:\n{path}")
+                return
+            try:
+                stats = write_workbook(self.journal.records(day), path)
+            except PermissionError:
+                # Usually the workbook is open in Excel
+                path = os.path.join(os.path.expanduser("~"), "Desktop", workbook_name(day))
+                stats = write_workbook(self.journal.records(day), path)
+            if stats is None:
+                if show_popup:
+                    self.notify("warning", "No Data", "No invoices saved for this day yet.")
+                return
+            self._exported[day] = journal_size
+            if show_popup:
+                self.notify("info", "Exported", f"Invoices exported to:\n{path}")
+        except Exception as e:
+            error_msg = f"Error exporting invoices to:\n{path}\n\nError: {str(e)}"
+            logging.error(error_msg)
+            if show_popup:
+                self.notify("error", "Export Error", error_msg)
+
+    def export_day_workbook_async(self):
+        day = datetime.now().date()
+        if not self.persistence.submit(("export", day), self.export_day_workbook, day):
+            messagebox.showwarning("Busy", "Saves are still being written. Please try again in a moment.")
 
-    def auto_save(self):
-        # Save to a special autosave file
-        self.save_to_excel(filename='autosave_invoice.xlsx', show_popup=False)
+    def export_month_workbook(self, month, days):
+        """Build Invoice_<year-month>.xlsx from the journals of the month's days."""
+        path = os.path.join(INVOICE_SAVE_DIR, month_name(month))
+        try:
+            write_workbook(journal_records(self.journal, days), path)
+        except Exception as e:
+            logging.error(f"Error exporting invoices to {path}: {e}")
+
+    def export_stale_days(self):
+        """Day close: rebuild every day's workbook that is older than its journal, and every finished month's."""
+        this_month = datetime.now().date().replace(day=1)
+        months = {}  # first of a finished month -> its days with a journal
+        for day in self.journal.days():
+            workbook_path = os.path.join(INVOICE_SAVE_DIR, workbook_name(day))
+            journal_path = self.journal.path_for(day)
+            if not os.path.exists(workbook_path) or os.path.getmtime(workbook_path) < os.path.getmtime(journal_path):
+                self.export_day_workbook(day, show_popup=False)
+            if day < this_month:
+                months.setdefault(day.replace(day=1), []).append(day)
+        for month, days in months.items():
+            workbook_path = os.path.join(INVOICE_SAVE_DIR, month_name(month))
+            changed = max(os.path.getmtime(self.journal.path_for(day)) for day in days)
+            if not os.path.exists(workbook_path) or os.path.getmtime(workbook_path) < changed:
+                self.export_month_workbook(month, days)
+
+    def on_close(self):
+        # Let queued saves finish, then close the day
+        if self._draft_sync is not None:
+            self.after_cancel(self._draft_sync)
+        self.sync_draft_log()
+        self.persistence.submit("export stale days", self.export_stale_days)
+        self.persistence.close(timeout=30)
+        logging.info(f"Persistence at exit: {self.persistence.stats()}")
+        logging.info(f"Skipped as unchanged: {self.skipped}; draft log: {self.draft_log.appends} edit(s) "
+                     f"in {self.draft_log.syncs} sync(s); receipts: {self.receipts.appended} archived, "
+                     f"{self.receipts.reprinted} reprinted")
+        self.store.close()
+        self.destroy()
+
+    def replay_draft_log(self):
+        """The drafts the last session left in the draft log, or None if it left no log."""
+        start = time.perf_counter()
+        recovery = self.draft_log.replay()
+        if recovery is not None:
+            logging.info(f"Replayed draft log in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return recovery
 
     def check_autosave_on_start(self):
+        """Offer back the drafts the last session left unsaved, replayed from the draft log."""
+        recovery, self._recovery = self._recovery, None
+        restored = []
+        if recovery is not None:
+            unsaved = [mode for mode, draft in recovery.drafts.items() if draft.unsaved and mode in MODES]
+            logging.info(f"Unsaved drafts from last session: {unsaved or 'none'}")
+            if unsaved and messagebox.askyesno(
+                    "Recover?", f"Recover unsaved invoice(s) from last session?\n({', '.join(unsaved)})"):
+                self.restore_drafts(recovery, unsaved)
+                restored = [recovery.drafts[mode].draft_id for mode in unsaved]
+        # Only the recovered drafts can be saved again as they were
+        self.persistence.submit("saved hashes", self.saved_hashes.keep, restored)
+        # Start the log over from what is on screen now; only then are edits synced to it
+        self.draft_log.checkpoint(self.draft_records())
+        self._draft_log_started = True
+        self.sync_draft_log()
+
+        # Autosave file left by versions before the draft log
         autosave_path = os.path.join(INVOICE_SAVE_DIR, 'autosave_invoice.xlsx')
         if os.path.exists(autosave_path):
             if messagebox.askyesno("Recover?", f"Recover unsaved invoice from last session?\n({autosave_path})"):
                 self.load_invoice(autosave_path)
 
+    def restore_drafts(self, recovery, modes):
+        """Put the recovered rows back into each mode's table."""
+        for mode in modes:
+            draft = recovery.drafts[mode]
+            table = self.tables.get(mode)
+            if table is None:
+                table = self.create_table(mode)
+            table.restore(draft.rows)
+            table.model.kata_amount = Money(draft.kata_amount)
+            if draft.draft_id is not None:
+                self._draft_ids[mode] = (table.model.draft, draft.draft_id)
+        self.customer_var.set(recovery.customer)
+        self.switch_mode()  # Repaints the total and the Kata field for the mode on screen
+        messagebox.showinfo('Recovered', f"Recovered unsaved invoice(s): {', '.join(modes)}")
+
     def load_invoice(self, filename):
         try:
             from openpyxl import load_workbook
@@ -1268,14 +1139,8 @@ class InvoiceApp(ctk.CTk):
                     # Set customer name from first row
                     self.customer_entry.delete(0, 'end')
                     self.customer_entry.insert(0, row[1])
-                # Add a row and fill in values
-                self.add_row()
-                last_row = self.rows[-1]['widgets']
-                # Fill in item and entry fields (skip timestamp, customer, and amount)
-                for j, value in enumerate(row[2:-1]):
-                    if hasattr(last_row[j], 'delete'):
-                        last_row[j].delete(0, 'end')
-                        last_row[j].insert(0, str(value) if value is not None else "")
+                # Add a row with the item and entry fields (skip timestamp, customer, and amount)
+                self.add_row([str(value) if value is not None else "" for value in row[2:-1]])
             self.update_amounts()
             import os
             os.remove(filename)  # Remove autosave after recovery
@@ -1283,10 +1148,6 @@ class InvoiceApp(ctk.CTk):
         except Exception as e:
             messagebox.showerror('Error', f'Could not load invoice: {e}')
 
-    def schedule_auto_save(self):
-        self.auto_save()
-        self.after(900000, self.schedule_auto_save)  # 15 minutes (900,000 ms)
-
 if __name__ == "__main__":
     app = InvoiceApp()
     app.mainloop()
\ No newline at end of file
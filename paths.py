@@ -0,0 +1,9 @@
+"""Where saved invoices live, shared by the app and the command-line tools."""
+import os
+
+INVOICE_SAVE_DIR = r"D:\invoices"  # Default directory for saving invoices
+JOURNAL_DIR = os.path.join(INVOICE_SAVE_DIR, "journal")  # Saved invoices; the day's xlsx is built from here
+STORE_PATH = os.path.join(INVOICE_SAVE_DIR, "invoices.db")  # SQLite index of every saved line
+INDEX_PATH = os.path.join(INVOICE_SAVE_DIR, "invoice_index.bin")  # invoice number -> journal location
+SAVED_HASHES_PATH = os.path.join(INVOICE_SAVE_DIR, "saved_hashes.txt")  # content hash of each saved draft
+RECEIPTS_DIR = os.path.join(INVOICE_SAVE_DIR, "receipts")  # bytes of every printed receipt, for reprints
@@ -0,0 +1,112 @@
+"""The one thread that writes invoices to disk.
+
+Every save, autosave and export is queued here instead of getting a thread
+of its own. That serializes them: two quick clicks, or a click during an
+autosave, can no longer have two writers on the same file. A job still
+waiting when another with the same key arrives is replaced, not run twice,
+so a burst of saves of the same draft costs one write. The queue is
+bounded, and submit never blocks the UI thread: it refuses the job instead.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+MAX_PENDING = 32
+SLOW_JOB_MS = 500  # jobs taking longer than this are logged at INFO, the rest at DEBUG
+
+
+class PersistenceWorker:
+    """A long-lived writer thread fed by a bounded, coalescing queue of keyed jobs."""
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._pending = OrderedDict()  # key -> (fn, args, kwargs, submitted_at), oldest first
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Counters for the log and stats()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_wait_ms = 0.0
+        self.last_write_ms = 0.0
+        self.max_depth = 0
+
+        self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); a pending job with the same key is replaced.
+
+        Returns False (without blocking) if the queue is full or closed.
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.submitted += 1
+            if key in self._pending:
+                # Keep the place in line of the job being replaced, with the newer data
+                self.coalesced += 1
+                submitted_at = self._pending[key][3]
+            elif len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                logging.warning(f"Persistence queue full ({len(self._pending)} pending); refused {key}")
+                return False
+            else:
+                submitted_at = time.perf_counter()
+            self._pending[key] = (fn, args, kwargs, submitted_at)
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify()
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return  # Closed and drained
+                key, (fn, args, kwargs, submitted_at) = self._pending.popitem(last=False)
+                depth = len(self._pending)
+            started = time.perf_counter()
+            try:
+                fn(*args, **kwargs)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Persistence job {key} failed: {e}")
+            finished = time.perf_counter()
+            with self._cond:
+                self.last_wait_ms = (started - submitted_at) * 1000
+                self.last_write_ms = (finished - started) * 1000
+            # Routine jobs (a draft log sync every second while typing) only show in debug logs
+            level = logging.INFO if self.last_write_ms >= SLOW_JOB_MS else logging.DEBUG
+            logging.log(level, f"Persisted {key}: waited {self.last_wait_ms:.1f}ms, "
+                               f"took {self.last_write_ms:.1f}ms, {depth} still queued")
+
+    def close(self, timeout=None):
+        """Run what is queued, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "last_wait_ms": self.last_wait_ms,
+            "last_write_ms": self.last_write_ms,
+        }
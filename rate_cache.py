@@ -0,0 +1,135 @@
+"""Last Rate and Hamali saved per customer, item and mode, to prefill lines (bounded LRU, append-only log)."""
+import glob
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from invoice_engine import MODES, Money
+
+CAPACITY = 5000
+WARM_WORKBOOKS = 30  # most recent day books read on a first run
+
+
+def _key(customer, item, mode):
+    return (" ".join(customer.split()).upper(), item, mode)
+
+
+class RateCache:
+    """Bounded LRU of (customer, item, mode) -> (rate text, hamali text)."""
+
+    def __init__(self, path, capacity=CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # loaded and recorded to from worker threads
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, customer, item, mode):
+        key = _key(customer, item, mode)
+        with self._lock:
+            rates = self._entries.get(key)
+            if rates is not None:
+                self._entries.move_to_end(key)
+            return rates
+
+    def _put(self, key, rates):
+        self._entries[key] = rates
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def record_invoice(self, invoice):
+        """Remember the rates of a saved invoice's lines and append them to the log."""
+        if not invoice.customer:
+            return
+        records = []
+        with self._lock:
+            for line in invoice.lines:
+                rates = (str(Money(line.rate)), str(Money(line.hamali_rate)))
+                key = _key(invoice.customer, line.item, invoice.mode)
+                self._put(key, rates)
+                records.append(json.dumps([*key, *rates]) + "\n")
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(records)
+        except Exception as e:
+            logging.error(f"Error saving rate cache {self.path}: {e}")
+
+    def load_async(self, history_dir, submit_write=None):
+        """Load on a thread of its own; see load() for submit_write."""
+        threading.Thread(target=self.load, args=(history_dir, submit_write), daemon=True).start()
+
+    def load(self, history_dir, submit_write=None):
+        """Replay the log, or warm the cache from the day books on a first run.
+
+        Rewriting the log (compacting it once it has grown well past capacity,
+        or creating it) is handed to submit_write(key, fn), e.g. the
+        persistence worker's submit, so it never races record_invoice's appends.
+        Without submit_write it is done here.
+        """
+        rewrite = False
+        try:
+            if os.path.exists(self.path):
+                rewrite = self._replay() > 2 * self.capacity
+            else:
+                self._warm_from_workbooks(history_dir)
+                rewrite = True
+            logging.info(f"Rate cache loaded: {len(self)} customer/item rates")
+        except Exception as e:
+            logging.error(f"Error loading rate cache: {e}")
+        if rewrite:
+            if submit_write is None:
+                self.compact()
+            elif not submit_write("rate cache compaction", self.compact):
+                logging.warning(f"Rate cache compaction refused; {self.path} is compacted on a later start")
+
+    def _replay(self):
+        count = 0
+        with open(self.path, encoding="utf-8") as f:
+            for record in f:
+                try:
+                    customer, item, mode, rate, hamali = json.loads(record)
+                except ValueError:
+                    continue  # A torn last line from a crash mid-append
+                with self._lock:
+                    self._put((customer, item, mode), (rate, hamali))
+                count += 1
+        return count
+
+    def compact(self):
+        """Rewrite the log as one record per cached pair."""
+        with self._lock:
+            records = [json.dumps([*key, *rates]) + "\n" for key, rates in self._entries.items()]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(records)
+        os.replace(tmp_path, self.path)
+
+    def _warm_from_workbooks(self, history_dir):
+        """One-off: read the Rate/Hamali columns of the most recent day books, oldest first."""
+        from openpyxl import load_workbook
+        from workbook_export import read_sheet_rows
+
+        paths = sorted(glob.glob(os.path.join(history_dir, "Invoice_*.xlsx")), key=os.path.getmtime)
+        for path in paths[-WARM_WORKBOOKS:]:
+            try:
+                wb = load_workbook(path, read_only=True)
+            except Exception as e:
+                logging.warning(f"Skipping {path} while warming rate cache: {e}")
+                continue
+            for mode, compiled in MODES.items():
+                if mode not in wb.sheetnames:
+                    continue
+                rate_col = compiled.column_names.index("rate")
+                hamali_col = compiled.column_names.index("hamali_rate")
+                for _, customer, cells in read_sheet_rows(wb, mode):
+                    if not customer or not cells[0]:
+                        continue
+                    rates = (str(Money.parse(cells[rate_col])), str(Money.parse(cells[hamali_col])))
+                    with self._lock:
+                        self._put(_key(customer, cells[0], mode), rates)
+            wb.close()
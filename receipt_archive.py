@@ -0,0 +1,102 @@
+"""Archive of the exact bytes sent to the receipt printer, indexed by invoice number and day, for reprints."""
+import mmap
+import os
+import struct
+import threading
+from collections import namedtuple
+from datetime import date
+
+SEGMENT_BYTES = 16 << 20
+INDEX_FILE = "receipts.idx"
+RECORD = struct.Struct("<QIIQI")  # invoice number (0: none), day (date.toordinal()), segment, offset, length (0: forgotten)
+
+Receipt = namedtuple("Receipt", "number day segment offset length")
+
+
+class ReceiptArchive:
+    """Append-only receipt segments plus an offset index; thread-safe."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._by_number = None  # number -> Receipt (the latest print of it), loaded on first use
+        self._read = 0          # bytes of the index read into _by_number
+        self._segment = 0       # segment being appended to
+        self.appended = 0
+        self.reprinted = 0
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"receipts_{segment:06d}.bin")
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load(self):
+        """Read the index records appended since the last call, by this process or another."""
+        if self._by_number is None:
+            self._by_number = {}
+        path = self._index_path()
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        size -= size % RECORD.size  # a torn last record is ignored
+        if size > self._read:
+            with open(path, "rb") as f:
+                f.seek(self._read)
+                data = f.read(size - self._read)
+            for fields in RECORD.iter_unpack(data):
+                self._remember(fields)
+            self._read = size
+
+    def _remember(self, fields):
+        number, day, segment, offset, length = fields
+        receipt = Receipt(number or None, date.fromordinal(day), segment, offset, length)
+        if not length:
+            self._by_number.pop(receipt.number, None)  # forgotten: the invoice was corrected after printing
+            return
+        if receipt.number is not None:
+            self._by_number[receipt.number] = receipt
+        self._segment = max(self._segment, segment)
+
+    def append(self, number, day, data):
+        """Archive the bytes sent to the printer for invoice number (None if it has none)."""
+        with self._lock:
+            self._load()
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._segment_path(self._segment)
+            if os.path.exists(path) and os.path.getsize(path) + len(data) > SEGMENT_BYTES:
+                self._segment += 1
+                path = self._segment_path(self._segment)
+            with open(path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            self._write_record((number or 0, day.toordinal(), self._segment, offset, len(data)))
+            self.appended += 1
+
+    def _write_record(self, fields):
+        with open(self._index_path(), "ab") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end % RECORD.size:
+                f.truncate(end - end % RECORD.size)  # drop a torn record
+            f.write(RECORD.pack(*fields))
+        self._load()
+
+    def forget(self, number, day):
+        """Stop reprinting invoice number's archived receipt, e.g. because the invoice was corrected."""
+        with self._lock:
+            self._load()
+            if number not in self._by_number:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_record((number, day.toordinal(), self._segment, 0, 0))  # length 0: forgotten
+
+    def find(self, number):
+        """The latest archived print of invoice number, or None."""
+        with self._lock:
+            self._load()
+            return self._by_number.get(number)
+
+    def read(self, receipt):
+        """The archived bytes of a receipt, exactly as they were sent."""
+        with open(self._segment_path(receipt.segment), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return data[receipt.offset:receipt.offset + receipt.length]
+
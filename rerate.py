@@ -0,0 +1,219 @@
+"""Batch re-rating of a day's saved invoices.
+
+When the market rate (or hamali rate) for an item is corrected late in the
+day, every line already saved for it has to be re-priced. DayBook loads the
+day's journal into columnar NumPy arrays, applies the change with the same
+integer formulas the invoice screen uses, and appends a corrected record for
+every invoice that changed. The day's workbook is then rebuilt from the
+journal with numeric cells, so Reopen, the SQLite store and every later
+export see the new rate. Days saved before the journal existed are first
+imported from their workbook.
+
+Usage:
+    python rerate.py 2024-11-05 MAIZE --rate 2150
+    python rerate.py 2024-11-05 "TOOR RED" --hamali 7.50 --mode Barthe
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from invoice_engine import MODES, build_invoice, parse_fixed, format_fixed
+from invoice_journal import JournalRecord
+
+
+def round_div_array(numerator, denominator):
+    """invoice_engine.round_div over an int64 array (half away from zero)."""
+    quotient = (np.abs(numerator) * 2 + denominator) // (2 * denominator)
+    return np.where(numerator >= 0, quotient, -quotient)
+
+
+class ModeColumns:
+    """One mode's saved lines as columns: everything a rate change needs, per line."""
+
+    def __init__(self, mode, records, positions, customers, items, billed, packets, rates, hamali_rates, amounts):
+        self.mode = mode
+        self.records = np.asarray(records, dtype=np.int64)          # index of the line's invoice in DayBook.records
+        self.positions = np.asarray(positions, dtype=np.int64)      # the line's position in its invoice
+        self.customers = np.asarray(customers, dtype=object)
+        self.items = np.asarray(items, dtype=object)
+        self.billed = np.asarray(billed, dtype=np.int64)            # grams billed at the rate
+        self.packets = np.asarray(packets, dtype=np.int64)          # thousandths of a packet
+        self.rates = np.asarray(rates, dtype=np.int64)              # paise
+        self.hamali_rates = np.asarray(hamali_rates, dtype=np.int64)  # paise per packet
+        self.amounts = np.asarray(amounts, dtype=np.int64)          # paise
+
+    def __len__(self):
+        return len(self.items)
+
+    @classmethod
+    def from_records(cls, records, mode):
+        """Every line of the mode's invoices, as the journal already parsed them."""
+        billed_field = MODES[mode].billed_field
+        columns = ([], [], [], [], [], [], [], [], [])
+        for record_index, (_, (_, invoice)) in enumerate(records):
+            if invoice.mode != mode:
+                continue
+            for position, line in enumerate(invoice.lines):
+                for column, value in zip(columns, (record_index, position, invoice.customer, line.item,
+                                                   getattr(line, billed_field), line.packets, line.rate,
+                                                   line.hamali_rate, line.amount)):
+                    column.append(value)
+        return cls(mode, *columns)
+
+    def select(self, item, customer=None):
+        mask = self.items == item
+        if customer is not None:
+            mask &= self.customers == customer
+        return mask
+
+    def rerate(self, mask, rate=None, hamali_rate=None):
+        """Apply a new rate and/or hamali rate (in paise) to the masked lines; return the changed mask."""
+        if rate is not None:
+            self.rates[mask] = rate
+        if hamali_rate is not None:
+            self.hamali_rates[mask] = hamali_rate
+        hamali = round_div_array(self.packets[mask] * self.hamali_rates[mask], 1000)
+        amounts = round_div_array(self.billed[mask] * self.rates[mask], 1000) - hamali
+        changed = mask.copy()
+        changed[mask] = amounts != self.amounts[mask]
+        self.amounts[mask] = amounts
+        return changed
+
+
+def rerated_invoice(invoice, rates):
+    """invoice with new rates at some lines (position -> (rate, hamali rate) in paise), or None if none differ."""
+    compiled = MODES[invoice.mode]
+    input_names = [compiled.column_names[i] for i in compiled.input_indexes]
+    rate_at, hamali_rate_at = input_names.index("rate"), input_names.index("hamali_rate")
+    lines = list(invoice.lines)
+    changed = False
+    for position, (rate, hamali_rate) in rates.items():
+        line = lines[position]
+        if (line.rate, line.hamali_rate) == (rate, hamali_rate):
+            continue
+        changed = True
+        texts = list(line.texts)
+        texts[rate_at] = format_fixed(rate, 2, 2)
+        texts[hamali_rate_at] = format_fixed(hamali_rate, 2, 2)
+        lines[position] = compiled.calculate(compiled.cells_of(line.item, texts))
+    if not changed:
+        return None
+    return build_invoice(invoice.customer, invoice.mode, lines, invoice.kata_amount, invoice.number)
+
+
+class DayBook:
+    """A day's saved invoices, loaded from the journal for batch corrections."""
+
+    def __init__(self, journal, day):
+        self.journal = journal
+        self.day = day
+        self.records = list(journal.current_records(day))  # (offset, JournalRecord), each as last corrected
+        self.sheets = {}
+        for mode in MODES:
+            columns = ModeColumns.from_records(self.records, mode)
+            if len(columns):
+                self.sheets[mode] = columns
+        self._touched = {}  # mode -> mask of lines whose invoices must be corrected
+
+    def rerate(self, item, rate=None, hamali_rate=None, mode=None, customer=None):
+        """Re-price every saved line of an item; rates are the texts an operator would type.
+
+        Returns the number of lines whose amount changed.
+        """
+        rate = parse_fixed(rate, 2) if rate is not None else None
+        hamali_rate = parse_fixed(hamali_rate, 2) if hamali_rate is not None else None
+        changed = 0
+        for sheet_mode, columns in self.sheets.items():
+            if mode is not None and sheet_mode != mode:
+                continue
+            mask = columns.select(item, customer)
+            if not mask.any():
+                continue
+            changed += int(columns.rerate(mask, rate, hamali_rate).sum())
+            touched = self._touched.get(sheet_mode)
+            self._touched[sheet_mode] = mask if touched is None else touched | mask
+        return changed
+
+    def save(self):
+        """Append a corrected record for every invoice with a re-rated line.
+
+        Returns (when, previous, corrected) for each invoice corrected.
+        """
+        rates_by_record = {}  # index in self.records -> {line position: (rate, hamali rate)}
+        for mode, mask in self._touched.items():
+            columns = self.sheets[mode]
+            for i in np.flatnonzero(mask):
+                rates_by_record.setdefault(int(columns.records[i]), {})[int(columns.positions[i])] = (
+                    int(columns.rates[i]), int(columns.hamali_rates[i]))
+        corrections = []
+        for record_index in sorted(rates_by_record):
+            offset, (when, invoice) = self.records[record_index]
+            corrected = rerated_invoice(invoice, rates_by_record[record_index])
+            if corrected is None:
+                continue  # Already at these rates
+            _, new_offset = self.journal.append(corrected, when, replaces=offset)
+            self.records[record_index] = (new_offset, JournalRecord(when, corrected))
+            corrections.append((when, invoice, corrected))
+        self._touched = {}
+        return corrections
+
+
+def main():
+    from invoice_journal import InvoiceJournal, workbook_name
+    from invoice_store import InvoiceStore
+    from paths import INVOICE_SAVE_DIR, JOURNAL_DIR, RECEIPTS_DIR, STORE_PATH
+    from receipt_archive import ReceiptArchive
+    from workbook_export import write_workbook
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Re-rate every saved line of an item on one day.")
+    parser.add_argument("day", help="YYYY-MM-DD")
+    parser.add_argument("item")
+    parser.add_argument("--rate")
+    parser.add_argument("--hamali")
+    parser.add_argument("--mode", choices=list(MODES))
+    parser.add_argument("--customer")
+    args = parser.parse_args()
+    if args.rate is None and args.hamali is None:
+        parser.error("give --rate and/or --hamali")
+
+    day = datetime.strptime(args.day, "%Y-%m-%d").date()
+    journal = InvoiceJournal(JOURNAL_DIR)
+    workbook_path = os.path.join(INVOICE_SAVE_DIR, workbook_name(day))
+    start = time.perf_counter()
+    # A day saved before the journal existed is read from its workbook, whatever its layout, once
+    journal.import_workbook(workbook_path, day)
+    book = DayBook(journal, day)
+    loaded = time.perf_counter()
+    changed = book.rerate(args.item.strip().upper(), args.rate, args.hamali, args.mode, args.customer)
+    rerated = time.perf_counter()
+    corrections = book.save()
+    saved = time.perf_counter()
+    logging.info(f"Re-rated {changed} line(s) of {args.item} in {len(corrections)} invoice(s): "
+                 f"load {loaded - start:.3f}s, rerate {(rerated - loaded) * 1000:.2f}ms, "
+                 f"journal {saved - rerated:.3f}s")
+    if not corrections:
+        return
+
+    receipts = ReceiptArchive(RECEIPTS_DIR)
+    store = InvoiceStore(STORE_PATH)
+    try:
+        for when, previous, corrected in corrections:
+            if corrected.number is not None:
+                # Its printed receipt shows the old rate: reopen and print it instead
+                receipts.forget(corrected.number, day)
+            store.replace(previous, corrected, when)
+    except Exception as e:
+        # The journal has the corrections; "python invoice_store.py rebuild" re-indexes them
+        logging.error(f"Error updating {STORE_PATH}: {e}")
+    finally:
+        store.close()
+    write_workbook(journal.records(day), workbook_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Content hashes of saved drafts, so saving a draft again unchanged is skipped."""
+import os
+import threading
+
+
+class SavedHashes:
+    """(draft, content hash) -> invoice number of every saved draft; thread-safe."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._saved = None  # loaded on first use
+        self._added = set()  # drafts saved by this process
+
+    def _load(self):
+        if self._saved is None:
+            saved = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for text in f:
+                        try:
+                            draft, content_hash, number = text.split()
+                            saved[(draft, content_hash)] = int(number)
+                        except ValueError:
+                            continue  # A torn last line from a crash mid-append
+            self._saved = saved
+        return self._saved
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def find(self, content_hash, draft):
+        """The invoice number the draft was saved as with this content, or None."""
+        with self._lock:
+            return self._load().get((draft, content_hash))
+
+    def add(self, content_hash, draft, number):
+        with self._lock:
+            self._load()[(draft, content_hash)] = number
+            self._added.add(draft)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{draft} {content_hash} {number}\n")
+
+    def keep(self, drafts):
+        """Forget every draft except these and the ones this process saved, and rewrite the file."""
+        with self._lock:
+            drafts = set(drafts) | self._added
+            self._saved = {key: number for key, number in self._load().items() if key[0] in drafts}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{draft} {content_hash} {number}\n"
+                             for (draft, content_hash), number in self._saved.items())
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,109 @@
+"""Frame-coalesced UI updates.
+
+Edits arrive one keystroke (one StringVar trace) at a time, and a paste,
+a replayed invoice or a Clear can fire dozens in one go. Instead of
+recomputing and repainting on each, callers mark what went stale and the
+scheduler does the work once, on the next after_idle tick.
+
+Tk must only be touched from the UI thread, so background jobs hand UI
+work (message boxes, status updates) to call_soon_threadsafe, and the UI
+thread runs it from a short polling loop.
+"""
+import logging
+import queue
+import time
+
+INBOX_POLL_MS = 100
+
+
+class FrameScheduler:
+    """Collects dirty rows and total repaints; flushes them once per idle tick."""
+
+    def __init__(self, widget, paint_total):
+        self.widget = widget
+        self.paint_total = paint_total
+        self._dirty_rows = {}       # table -> row ids edited since the last flush
+        self._repaint_tables = set()
+        self._total_dirty = False
+        self._pending = None        # after_idle id while a flush is queued
+        self._inbox = queue.SimpleQueue()  # UI calls posted by other threads
+
+        # Counters, so a burst's real cost shows up in the log
+        self.marks = 0
+        self.recomputes = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def mark_row(self, table, row_id):
+        """A cell of row_id changed; recompute it and its painted amounts in the next flush."""
+        self._dirty_rows.setdefault(table, set()).add(row_id)
+        self.marks += 1
+        self._schedule()
+
+    def mark_table(self, table):
+        """Repaint every visible row of table."""
+        self._repaint_tables.add(table)
+        self._schedule()
+
+    def mark_total(self):
+        self._total_dirty = True
+        self._schedule()
+
+    def call_soon_threadsafe(self, fn, *args):
+        """Run fn(*args) on the UI thread; safe to call from any thread."""
+        self._inbox.put((fn, args))
+
+    def poll_inbox(self):
+        """Run the calls other threads posted, then poll again (start once from the UI thread)."""
+        while True:
+            try:
+                fn, args = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                logging.error(f"Error in posted UI call {getattr(fn, '__name__', fn)}: {e}")
+        self.widget.after(INBOX_POLL_MS, self.poll_inbox)
+
+    def _schedule(self):
+        if self._pending is None:
+            self._pending = self.widget.after_idle(self.flush)
+
+    def flush(self):
+        """Do all the marked work now (also fine to call directly before a save or print)."""
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+        if not (self._dirty_rows or self._repaint_tables or self._total_dirty):
+            return
+
+        start = time.perf_counter()
+        dirty_rows, self._dirty_rows = self._dirty_rows, {}
+        repaint_tables, self._repaint_tables = self._repaint_tables, set()
+        marks = sum(len(rows) for rows in dirty_rows.values())
+        recomputed = 0
+        for table, row_ids in dirty_rows.items():
+            for row_id in row_ids:
+                if row_id not in table.model.order:
+                    continue  # Deleted before the flush
+                try:
+                    line = table.model.recompute(row_id)
+                except Exception as e:
+                    logging.error(f"Error calculating amount: {e}")
+                    table.paint_error(row_id)
+                    continue
+                recomputed += 1
+                if table not in repaint_tables:
+                    table.paint_row(row_id, line)
+        for table in repaint_tables:
+            table.repaint()
+        self.paint_total()
+        self._total_dirty = False
+
+        self.recomputes += recomputed
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        logging.debug(f"UI flush #{self.flushes}: {marks} dirty row(s), {recomputed} recompute(s), "
+                      f"{len(repaint_tables)} table repaint(s) in {self.last_flush_ms:.2f}ms "
+                      f"({self.marks} edits -> {self.recomputes} recomputes so far)")
@@ -0,0 +1,24 @@
+"""Fonts and colours shared by the invoice window and its table."""
+
+# Define font configurations
+HEADER_FONT = ("Segoe UI", 28, "bold")
+SUBHEADER_FONT = ("Segoe UI", 16)
+LABEL_FONT = ("Segoe UI", 13)
+ENTRY_FONT = ("Segoe UI", 13)
+TABLE_HEADER_FONT = ("Segoe UI", 13, "bold")
+TABLE_FONT = ("Segoe UI", 13)
+BUTTON_FONT = ("Segoe UI", 13)
+
+# Define color scheme for light theme
+PRIMARY_COLOR = "#1976d2"      # Blue
+SECONDARY_COLOR = "#2196f3"    # Lighter blue
+ACCENT_COLOR = "#64b5f6"       # Even lighter blue
+BACKGROUND_COLOR = "#ffffff"    # White
+FRAME_COLOR = "#f5f5f5"        # Light gray
+BORDER_COLOR = "#e0e0e0"       # Border gray
+TEXT_COLOR = "#212121"         # Dark gray for text
+ERROR_COLOR = "#f44336"        # Red
+
+# Table cells use a larger font than the rest of the form
+TABLE_CELL_FONT = ("Segoe UI", 15)  # Increased from default 13 to 15 (15% increase)
+COMPUTED_CELL_COLOR = "#eef2f5"  # Read-only cells the table fills in (Final Wt, Total Qty)
@@ -0,0 +1,230 @@
+"""Excel workbooks streamed from the journal: numeric cells, one write-only sheet per mode."""
+import argparse
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from invoice_engine import MODES
+from invoice_journal import TIMESTAMP_FORMAT
+
+HEADER_ROW = ["Timestamp", "Customer"]
+SCHEMA_VERSION = 2
+SCHEMA_SHEET = "Schema"  # hidden sheet with the layout version of each mode sheet (see SHEET_LAYOUTS)
+AMOUNT_FORMAT = "0.00"  # the computed column and the amount, as the table shows them
+TIMESTAMP_WIDTH = 20
+CUSTOMER_WIDTH = 24
+COLUMN_WIDTH = 14
+
+ExportStats = namedtuple("ExportStats", "invoices rows seconds")
+
+
+def _layouts():
+    """Version -> mode -> the field name of each sheet column."""
+    current = {mode: ["timestamp", "customer", *compiled.column_names, "amount"]
+               for mode, compiled in MODES.items()}
+    final_py = {
+        "Patti": ["timestamp", "customer", "item", "packet", "quantity", "rate", "hamali_rate", "amount"],
+        "Kata": ["timestamp", "customer", "item", "net", "less", "rate", "hamali_rate", "amount"],
+        "Barthe": ["timestamp", "customer", "item", "packet", "weight", "adjustment", "rate", "hamali_rate",
+                   "amount"],
+    }
+    return {
+        0: final_py,   # final.py, every cell text
+        1: current,    # main.py before the schema marker, every cell text
+        2: current,    # numeric cells, Schema sheet
+    }
+
+
+SHEET_LAYOUTS = _layouts()
+
+# Header rows of the unmarked layouts -> their version
+_LEGACY_HEADERS = {
+    (mode, tuple(HEADER_ROW + headers)): version
+    for version, headers_by_mode in (
+        (0, {"Patti": ["Item", "Packet", "Quantity", "Rate", "Hamali", "Amount"],
+             "Kata": ["Item", "Net Wt", "Less%", "Rate", "Hamali Rate", "Amount"],
+             "Barthe": ["Item", "Packet", "Weight", "+/-", "Rate", "Hamali", "Amount"]}),
+        (1, {mode: compiled.headers for mode, compiled in MODES.items()}),
+    )
+    for mode, headers in headers_by_mode.items()
+}
+
+
+def rows_per_second(stats):
+    return stats.rows / stats.seconds if stats.seconds else float(stats.rows)
+
+
+def month_name(month):
+    return f"Invoice_{month:%Y-%m}.xlsx"
+
+
+class _HeaderStyle:
+    """Font, fill and alignment shared by every header cell of a workbook."""
+
+    def __init__(self):
+        from openpyxl.styles import Alignment, Font, PatternFill
+
+        self.font = Font(bold=True, color="FFFFFF")
+        self.fill = PatternFill("solid", fgColor="547792")
+        self.alignment = Alignment(horizontal="center")
+
+    def cells(self, ws, values):
+        from openpyxl.cell import WriteOnlyCell
+
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value)
+            cell.font = self.font
+            cell.fill = self.fill
+            cell.alignment = self.alignment
+            cells.append(cell)
+        return cells
+
+
+def _cell_text(value):
+    """A sheet value back as the text the operator would have typed."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value).strip()
+
+
+def _sheet_versions(wb):
+    if SCHEMA_SHEET not in wb.sheetnames:
+        return {}
+    versions = {}
+    for row in wb[SCHEMA_SHEET].iter_rows(min_row=2, values_only=True):
+        if row and row[0] is not None and row[1] is not None:
+            versions[str(row[0])] = int(row[1])
+    return versions
+
+
+def read_sheet_rows(wb, mode):
+    """(timestamp, customer, cells) for every data row of a mode's sheet, whatever its layout.
+
+    cells are the table cells as text (computed column blank). Rows under a
+    header row that matches no known layout are skipped.
+    """
+    compiled = MODES[mode]
+    version = _sheet_versions(wb).get(mode)
+    columns = SHEET_LAYOUTS[version][mode] if version in SHEET_LAYOUTS else None
+    for row in wb[mode].iter_rows(values_only=True):
+        if not row or row[0] is None:
+            continue
+        if row[0] == "Timestamp":
+            if version is None:
+                # An unmarked sheet: the header row says which layout follows
+                legacy = _LEGACY_HEADERS.get((mode, tuple(v for v in row if v is not None)))
+                columns = SHEET_LAYOUTS[legacy][mode] if legacy is not None else None
+            continue
+        if columns is None:
+            continue
+        values = dict(zip(columns, row))
+        cells = [_cell_text(values.get(name)) for name in compiled.column_names]
+        if compiled.computed_column is not None:
+            cells[compiled.computed_column] = ""
+        yield str(values["timestamp"]), _cell_text(values.get("customer")), cells
+
+
+def _create_sheet(wb, mode, header_style):
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title=mode)
+    headers = HEADER_ROW + MODES[mode].headers
+    # Column widths and panes must be set before the first row is streamed
+    ws.column_dimensions["A"].width = TIMESTAMP_WIDTH
+    ws.column_dimensions["B"].width = CUSTOMER_WIDTH
+    for column in range(3, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(column)].width = COLUMN_WIDTH
+    ws.freeze_panes = "A2"
+    ws.append(header_style.cells(ws, headers))
+    return ws
+
+
+def write_workbook(records, path):
+    """Stream (when, invoice) records into an xlsx, one sheet per mode.
+
+    Returns ExportStats, or None (and writes nothing) if there were no lines.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    start = time.perf_counter()
+    wb = Workbook(write_only=True)
+    header_style = _HeaderStyle()
+    sheets = {}
+    invoices = rows = 0
+    for when, invoice in records:
+        if not invoice.lines:
+            continue
+        compiled = MODES[invoice.mode]
+        ws = sheets.get(invoice.mode)
+        if ws is None:
+            ws = sheets[invoice.mode] = _create_sheet(wb, invoice.mode, header_style)
+        # Sheet columns that get the amount format: the computed one and the amount
+        formatted = [2 + compiled.cell_count]
+        if compiled.computed_column is not None:
+            formatted.append(2 + compiled.computed_column)
+        timestamp = when.strftime(TIMESTAMP_FORMAT)
+        customer = invoice.customer or "Unknown Customer"
+        for line in invoice.lines:
+            values = [timestamp, customer] + line.typed_values()
+            for column in formatted:
+                cell = values[column] = WriteOnlyCell(ws, values[column])
+                cell.number_format = AMOUNT_FORMAT
+            ws.append(values)
+        invoices += 1
+        rows += len(invoice.lines)
+    if not sheets:
+        wb.close()
+        return None
+    schema = wb.create_sheet(title=SCHEMA_SHEET)
+    schema.sheet_state = "hidden"
+    schema.append(["Sheet", "Version", "Columns"])
+    for mode in sheets:
+        schema.append([mode, SCHEMA_VERSION, ",".join(SHEET_LAYOUTS[SCHEMA_VERSION][mode])])
+    tmp_path = path + ".tmp"
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    stats = ExportStats(invoices, rows, time.perf_counter() - start)
+    logging.info(f"Wrote {stats.rows} row(s) from {stats.invoices} invoice(s) to {path} in "
+                 f"{stats.seconds:.2f}s ({rows_per_second(stats):.0f} rows/s)")
+    return stats
+
+
+def journal_records(journal, days):
+    """Every invoice saved on the given days, read lazily in day order."""
+    for day in days:
+        yield from journal.records(day)
+
+
+def main():
+    from invoice_journal import InvoiceJournal, workbook_name
+    from paths import INVOICE_SAVE_DIR, JOURNAL_DIR
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Export saved invoices to an Excel workbook.")
+    period = parser.add_mutually_exclusive_group(required=True)
+    period.add_argument("--day", help="YYYY-MM-DD")
+    period.add_argument("--month", help="YYYY-MM")
+    parser.add_argument("--output", help="workbook path (default: in the invoices folder)")
+    args = parser.parse_args()
+
+    journal = InvoiceJournal(JOURNAL_DIR)
+    if args.day:
+        day = datetime.strptime(args.day, "%Y-%m-%d").date()
+        days, name = [day], workbook_name(day)
+    else:
+        month = datetime.strptime(args.month, "%Y-%m").date()
+        days = [day for day in journal.days() if (day.year, day.month) == (month.year, month.month)]
+        name = month_name(month)
+    path = args.output or os.path.join(INVOICE_SAVE_DIR, name)
+    if write_workbook(journal_records(journal, days), path) is None:
+        logging.warning("No invoices saved in that period")
+
+
+if __name__ == "__main__":
+    main()